@@ -1,6 +1,6 @@
 from .cameras import Camera
-from .hulls import AbstractHull, Plane, Sphere
-from .matrices import Matrix
+from .hulls import AbstractHull, FoldedPlane, FoldedSphere, Plane, Sphere
+from .matrices import Matrix, Matrix4
 from .patterns import (
     AbstractPattern,
     AddBlendPattern,
@@ -14,11 +14,13 @@ from .patterns import (
     SolidPattern,
     StripePattern
 )
-from .lighting import Intersection, Intersections, Ray, Light, Material, Hull
+from .lighting import HitBuffer, Intersection, Intersections, Ray, Light, Material, Hull
 from .renderer import Canvas
+from .scenes import CompiledScene, SharedScene
 from .shared import *
 from .tuples import *
 from .worlds import World
+from .workers import Renderer
 
 import tracer.transforms
 
@@ -0,0 +1,251 @@
+"""
+Bounding volume hierarchy for World.intersect.
+
+Hulls expose world space bounds through AbstractHull.bounds(); hulls without
+bounds (planes) are kept out of the hierarchy and always tested.
+"""
+from __future__ import annotations
+
+from math import inf
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+from .lighting import Hull, Ray
+from .matrices import Matrix
+from .tuples import Vector
+
+__all__ = [
+    "BoundingBox",
+    "BVH",
+]
+
+
+class BoundingBox(NamedTuple):
+    min_x: float
+    min_y: float
+    min_z: float
+    max_x: float
+    max_y: float
+    max_z: float
+
+    @classmethod
+    def around(cls, points: Sequence[Vector]) -> BoundingBox:
+        xs = [point.x for point in points]
+        ys = [point.y for point in points]
+        zs = [point.z for point in points]
+        return cls(min(xs), min(ys), min(zs), max(xs), max(ys), max(zs))
+
+    @property
+    def corners(self) -> list[Vector]:
+        return [
+            Vector.point(x, y, z)
+            for x in (self.min_x, self.max_x)
+            for y in (self.min_y, self.max_y)
+            for z in (self.min_z, self.max_z)
+        ]
+
+    @property
+    def centroid(self) -> tuple[float, float, float]:
+        return (
+            (self.min_x + self.max_x) / 2,
+            (self.min_y + self.max_y) / 2,
+            (self.min_z + self.max_z) / 2,
+        )
+
+    @property
+    def surface_area(self) -> float:
+        x = self.max_x - self.min_x
+        y = self.max_y - self.min_y
+        z = self.max_z - self.min_z
+        return 2 * (x * y + y * z + z * x)
+
+    def union(self, other: BoundingBox) -> BoundingBox:
+        return BoundingBox(
+            min(self.min_x, other.min_x),
+            min(self.min_y, other.min_y),
+            min(self.min_z, other.min_z),
+            max(self.max_x, other.max_x),
+            max(self.max_y, other.max_y),
+            max(self.max_z, other.max_z),
+        )
+
+    def transform(self, transform: Matrix) -> BoundingBox:
+        return BoundingBox.around([transform.transform_point(corner) for corner in self.corners])
+
+    def entry(self, origin: Vector, inverse_direction: tuple[float, float, float], t_max: float = inf) -> Optional[float]:
+        """Distance at which the ray enters the box, or None if it misses it before t_max."""
+        near = -inf
+        far = t_max
+        for low, high, start, inverse in (
+                (self.min_x, self.max_x, origin.x, inverse_direction[0]),
+                (self.min_y, self.max_y, origin.y, inverse_direction[1]),
+                (self.min_z, self.max_z, origin.z, inverse_direction[2]),
+        ):
+            if inverse == inf:
+                # Parallel to this slab: inside it or never.
+                if start < low or start > high:
+                    return None
+                continue
+            t_low = (low - start) * inverse
+            t_high = (high - start) * inverse
+            if t_low > t_high:
+                t_low, t_high = t_high, t_low
+            if t_low > near:
+                near = t_low
+            if t_high < far:
+                far = t_high
+            if near > far:
+                return None
+        if far < 0:
+            return None
+        return near
+
+
+def inverse_direction(direction: Vector) -> tuple[float, float, float]:
+    return tuple(1 / value if value else inf for value in direction[:3])
+
+
+class _Node:
+    __slots__ = ("box", "left", "right", "hulls")
+
+    def __init__(self, box: BoundingBox, left: _Node = None, right: _Node = None, hulls: tuple = ()):
+        self.box = box
+        self.left = left
+        self.right = right
+        self.hulls = hulls
+
+
+class BVH:
+    """
+    A binary hierarchy of bounding boxes built with the surface area heuristic.
+
+    Hulls are split along the axis where their centroids spread the most,
+    using the cheapest of a fixed number of bucket boundaries.
+    """
+
+    buckets = 12
+    leaf_size = 2
+
+    def __init__(self, hulls: Sequence[Hull]):
+        items = [(hull.bounds(), hull) for hull in hulls]
+        if any(box is None for box, _ in items):
+            raise ValueError("BVH can only hold hulls with bounds.")
+        self.size = len(items)
+        self.root = self._build(items) if items else None
+
+    def __len__(self):
+        return self.size
+
+    def _build(self, items: list[tuple[BoundingBox, Hull]]) -> _Node:
+        box = items[0][0]
+        for other, _ in items[1:]:
+            box = box.union(other)
+        if len(items) <= self.leaf_size:
+            return _Node(box, hulls=tuple(hull for _, hull in items))
+
+        centroids = [other.centroid for other, _ in items]
+        spreads = [
+            max(centroid[axis] for centroid in centroids) - min(centroid[axis] for centroid in centroids)
+            for axis in range(3)
+        ]
+        axis = spreads.index(max(spreads))
+        if spreads[axis] == 0:
+            return _Node(box, hulls=tuple(hull for _, hull in items))
+        low = min(centroid[axis] for centroid in centroids)
+        scale = self.buckets / spreads[axis]
+
+        def bucket_of(centroid):
+            return min(int((centroid[axis] - low) * scale), self.buckets - 1)
+
+        counts = [0] * self.buckets
+        boxes: list[Optional[BoundingBox]] = [None] * self.buckets
+        for centroid, (other, _) in zip(centroids, items):
+            bucket = bucket_of(centroid)
+            counts[bucket] += 1
+            boxes[bucket] = other if boxes[bucket] is None else boxes[bucket].union(other)
+
+        best_cost = inf
+        best_split = None
+        for split in range(1, self.buckets):
+            left_count = sum(counts[:split])
+            right_count = len(items) - left_count
+            if not left_count or not right_count:
+                continue
+            cost = (
+                left_count * self._area(boxes[:split])
+                + right_count * self._area(boxes[split:])
+            )
+            if cost < best_cost:
+                best_cost = cost
+                best_split = split
+
+        if best_split is None:
+            return _Node(box, hulls=tuple(hull for _, hull in items))
+        left = [item for centroid, item in zip(centroids, items) if bucket_of(centroid) < best_split]
+        right = [item for centroid, item in zip(centroids, items) if bucket_of(centroid) >= best_split]
+        return _Node(box, self._build(left), self._build(right))
+
+    @staticmethod
+    def _area(boxes: list[Optional[BoundingBox]]) -> float:
+        union = None
+        for box in boxes:
+            if box is not None:
+                union = box if union is None else union.union(box)
+        return union.surface_area
+
+    def candidates(self, ray: Ray, t_max: float = inf) -> Iterator[Hull]:
+        """Every hull whose leaf box the ray passes through before t_max."""
+        if self.root is None:
+            return
+        origin = ray.origin
+        inverse = inverse_direction(ray.direction)
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.box.entry(origin, inverse, t_max) is None:
+                continue
+            if node.hulls:
+                yield from node.hulls
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+
+    def closest(self, ray: Ray, t_max: float = inf) -> tuple[Optional[Hull], float]:
+        """
+        Nearest hull hit in (0, t_max) and its distance, visiting nearer boxes first.
+
+        The best distance so far is passed to each hull's closest_distance, and
+        boxes entered beyond it are skipped. Returns (None, t_max) on a miss.
+        """
+        nearest = None
+        best = t_max
+        if self.root is None:
+            return nearest, best
+        origin = ray.origin
+        inverse = inverse_direction(ray.direction)
+        entry = self.root.box.entry(origin, inverse, best)
+        stack = [] if entry is None else [(entry, self.root)]
+        while stack:
+            entry, node = stack.pop()
+            if entry >= best:
+                continue
+            if node.hulls:
+                for hull in node.hulls:
+                    distance = hull.closest_distance(ray, best)
+                    if distance is not None:
+                        nearest = hull
+                        best = distance
+                continue
+            left_entry = node.left.box.entry(origin, inverse, best)
+            right_entry = node.right.box.entry(origin, inverse, best)
+            if left_entry is None:
+                if right_entry is not None:
+                    stack.append((right_entry, node.right))
+            elif right_entry is None:
+                stack.append((left_entry, node.left))
+            elif left_entry <= right_entry:
+                stack.append((right_entry, node.right))
+                stack.append((left_entry, node.left))
+            else:
+                stack.append((left_entry, node.left))
+                stack.append((right_entry, node.right))
+        return nearest, best
@@ -1,19 +1,21 @@
 from __future__ import annotations
 
-from functools import partial
+from concurrent.futures import Executor
 from itertools import product
 from math import tan
-from multiprocessing import Pool
-from os import cpu_count
+from pathlib import Path
+from typing import Optional, Union
 
-from tracer.matrices import Matrix
+from tracer.matrices import Matrix, Transformable
 from tracer.lighting import Ray
 from tracer.renderer import Canvas
-from tracer.tuples import Vector, Color
-from tracer.worlds import World
+from tracer.checkpoints import Checkpoint, checkpoint_key
+from tracer.executors import AbstractExecutor, resolve
+from tracer.tiles import split
+from tracer.tuples import Vector
 
 
-class Camera:
+class Camera(Transformable):
     """A camera"""
 
     def __init__(self, horizontal_pixels: int, vertical_pixels: int, field_of_view: int | float, transform: Matrix = Matrix.identity):
@@ -38,28 +40,84 @@ class Camera:
         world_x = self.half_width - x_offset
         world_y = self.half_height - y_offset
 
-        transform = self.transform.inverse()
-        pixel: Vector = transform * Vector.point(world_x, world_y, -1)
-        origin: Vector = transform * Vector.point(0, 0, 0)
+        transform = self.inverse_transform
+        pixel: Vector = transform.transform_point(Vector.point(world_x, world_y, -1))
+        origin: Vector = transform.transform_point(Vector.point(0, 0, 0))
         direction = (pixel - origin).normalize()
 
         return Ray(origin, direction)
 
-    def _get_pixel(self, world: World, x: int, y: int) -> tuple[int, int, Color]:
-        ray = self.ray_for_pixel(x, y)
-        return x, y, world.color_at(ray)
+    def render(
+            self, world, tile_size: int = 16,
+            executor: Union[None, str, AbstractExecutor, Executor] = None, workers: Optional[int] = None,
+            storage: str = "list", canvas: Optional[Canvas] = None,
+            checkpoint: Union[Path, str, None] = None
+    ) -> Canvas:
+        """
+        Render the world in tiles of tile_size by tile_size pixels.
 
-    def render(self, world) -> Canvas:
-        cpus = max(cpu_count() // 2, 1)
+        The world is compiled once (the compiled scene keeps World's BVH, see
+        tracer.scenes) and the tiles are handed to the executor
+        (see tracer.executors.resolve). The default is a pool of workers
+        processes, half the CPU count unless given; executor="serial"
+        renders in the calling process. storage picks the Canvas
+        storage; "array" keeps large frames compact. Pass canvas to render
+        into an existing canvas instead, such as one with mmap storage.
 
-        total_pixels = self.horizontal_pixels * self.vertical_pixels
-        coordinates = product(range(self.horizontal_pixels), range(self.vertical_pixels))
-        pool = Pool(cpus)
-        pixels = pool.starmap(func=partial(self._get_pixel, world), iterable=coordinates, chunksize=total_pixels // cpus)
-        pool.close()
-        pool.join()
-        canvas = Canvas(self.horizontal_pixels, self.vertical_pixels)
-        for x, y, color in pixels:
-            canvas[x, y] = color
+        With checkpoint, finished tiles are also recorded on disk at that path
+        (see tracer.checkpoints). A render of the same scene and camera with
+        the same path and tile size skips the tiles recorded there, and the
+        checkpoint is deleted once the frame is complete.
+        """
+        scene = world.compile()
+        if canvas is None:
+            canvas = Canvas(self.horizontal_pixels, self.vertical_pixels, storage=storage)
+        elif (canvas.width, canvas.height) != (self.horizontal_pixels, self.vertical_pixels):
+            raise ValueError("The canvas does not match the camera's size.")
+        tiles = split(self.horizontal_pixels, self.vertical_pixels, tile_size)
+        backend = resolve(executor, workers)
+        if checkpoint is None:
+            backend.render(self, scene, tiles, canvas)
+            return canvas
+        key = checkpoint_key(self, scene, tile_size)
+        with Checkpoint(checkpoint, key, self.horizontal_pixels, self.vertical_pixels) as saved:
+            backend.render(self, scene, saved.remaining(tiles), saved)
+            for y in range(self.vertical_pixels):
+                canvas.set_row(y, saved.canvas.row(y))
+        saved.discard()
+        return canvas
+
+    def render_to(
+            self, world, sink, tile_size: int = 16,
+            executor: Union[None, str, AbstractExecutor, Executor] = None, workers: Optional[int] = None
+    ):
+        """
+        Render the world into a streaming sink (see tracer.sinks) instead of a Canvas.
+
+        Tiles are scheduled in the sink's file order, so rows complete, and
+        leave the sink's buffer, roughly as fast as they are rendered. The
+        sink is left open.
+        """
+        scene = world.compile()
+        tiles = split(self.horizontal_pixels, self.vertical_pixels, tile_size)
+        if getattr(sink, "bottom_up", False):
+            tiles.sort(key=lambda tile: -tile.y)
+        resolve(executor, workers).render(self, scene, tiles, sink)
 
+    def render_packets(self, world, scanlines: int = 16) -> Canvas:
+        """
+        Render with the vectorised PacketEngine, a block of scanlines per packet.
+
+        Needs NumPy and a world the engine supports (see PacketEngine.supports).
+        """
+        from tracer.packets import PacketEngine, RayPacket
+
+        engine = PacketEngine(world)
+        canvas = Canvas(self.horizontal_pixels, self.vertical_pixels)
+        for top in range(0, self.vertical_pixels, scanlines):
+            coordinates = list(product(range(top, min(top + scanlines, self.vertical_pixels)), range(self.horizontal_pixels)))
+            ys, xs = zip(*coordinates)
+            colors = engine.colors_at(RayPacket.for_pixels(self, xs, ys))
+            for (y, x), color in zip(coordinates, colors):
+                canvas[x, y] = color
         return canvas
@@ -0,0 +1,137 @@
+"""
+Tile level checkpoints, so an interrupted render can pick up where it stopped.
+
+A checkpoint is two files: the partial frame, as a Canvas with mmap storage
+at the checkpoint path, and a journal beside it (path + ".tiles") naming the
+finished tiles. Each tile is flushed into the frame before it is journaled,
+so every journaled tile is on disk. The journal starts with a key hashing
+the camera, the compiled scene and the tile size; a checkpoint with a
+different key belongs to another render and is started afresh.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+from hashlib import sha256
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+from .renderer import Canvas
+from .scenes import CompiledScene
+from .tiles import Tile
+
+__all__ = [
+    "Checkpoint",
+    "checkpoint_key",
+]
+
+_JOURNAL_VERSION = "tracer-checkpoint 1"
+
+
+def checkpoint_key(camera, scene: CompiledScene, tile_size: int) -> str:
+    digest = sha256(scene.digest().encode("ascii"))
+    digest.update(pickle.dumps(
+        (
+            camera.horizontal_pixels,
+            camera.vertical_pixels,
+            camera.field_of_view,
+            camera.transform.data,
+            tile_size,
+        ),
+        pickle.HIGHEST_PROTOCOL
+    ))
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """
+    A partially rendered frame on disk, resumed when opened with the same key.
+
+    Render into it like a Canvas (it has width, height and blit); blit
+    records the tile as finished. remaining() filters a tile list down to the
+    unfinished ones. discard() removes both files once the render is done.
+    """
+
+    def __init__(self, path: Union[Path, str], key: str, width: int, height: int):
+        self.path = Path(path)
+        self.journal_path = Path(f"{path}.tiles")
+        self.key = key
+        self.width = width
+        self.height = height
+        completed = self._read_journal()
+        canvas = None if completed is None else self._reopen()
+        if canvas is None:
+            canvas = Canvas(width, height, storage="mmap", path=self.path)
+            completed = set()
+        self.canvas = canvas
+        self.completed: set[Tile] = completed
+        # Rewrite the journal, dropping anything a crash left half written.
+        temporary = Path(f"{self.journal_path}.new")
+        with open(temporary, "w") as journal:
+            journal.write(self._header())
+            for tile in sorted(completed, key=lambda tile: (tile.y, tile.x)):
+                journal.write(f"{tile.x} {tile.y} {tile.width} {tile.height}\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary, self.journal_path)
+        self._journal = open(self.journal_path, "a")
+
+    def _header(self) -> str:
+        return f"{_JOURNAL_VERSION} {self.key} {self.width} {self.height}\n"
+
+    def _read_journal(self) -> Optional[set[Tile]]:
+        """The finished tiles of a matching checkpoint, or None when there is nothing to resume."""
+        if not self.path.exists() or not self.journal_path.exists():
+            return None
+        with open(self.journal_path) as journal:
+            lines = journal.read().split("\n")
+        if lines[0] + "\n" != self._header():
+            return None
+        completed = set()
+        # The last entry is either empty or a line cut short by a crash.
+        for line in lines[1:-1]:
+            completed.add(Tile(*map(int, line.split())))
+        return completed
+
+    def _reopen(self) -> Optional[Canvas]:
+        """The partial frame, or None when the file is damaged or does not match the journal."""
+        try:
+            canvas = Canvas.open(self.path)
+        except ValueError:
+            return None
+        if (canvas.width, canvas.height) != (self.width, self.height):
+            canvas.close()
+            return None
+        return canvas
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.completed)
+
+    def remaining(self, tiles: Sequence[Tile]) -> list[Tile]:
+        return [tile for tile in tiles if tile not in self.completed]
+
+    def blit(self, x: int, y: int, width: int, height: int, values: Sequence[float]):
+        self.canvas.blit(x, y, width, height, values)
+        self.canvas.flush()
+        self._journal.write(f"{x} {y} {width} {height}\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.completed.add(Tile(x, y, width, height))
+
+    def __enter__(self) -> Checkpoint:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if not self._journal.closed:
+            self._journal.close()
+        self.canvas.close()
+
+    def discard(self):
+        """Close the checkpoint and delete its files."""
+        self.close()
+        self.path.unlink()
+        self.journal_path.unlink()
@@ -0,0 +1,188 @@
+"""
+Execution back ends for Camera.render.
+
+Every back end takes a camera, a compiled scene and a list of tiles, and
+yields (tile, buffer) pairs as tiles finish, in whatever order they finish.
+"""
+from __future__ import annotations
+
+from array import array
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from multiprocessing import Pool
+from os import cpu_count
+from typing import Iterator, Optional, Sequence, Union
+
+from .renderer import Canvas
+from .scenes import SharedScene
+from .tiles import (
+    SharedFramebuffer,
+    Tile,
+    _initialize_worker,
+    _render_worker_tile,
+    _write_worker_tile,
+    render_tile,
+)
+
+__all__ = [
+    "AbstractExecutor",
+    "FuturesExecutor",
+    "ProcessExecutor",
+    "SerialExecutor",
+    "ThreadExecutor",
+    "default_workers",
+    "resolve",
+]
+
+
+def default_workers() -> int:
+    return max((cpu_count() or 1) // 2, 1)
+
+
+def _check_workers(workers: Optional[int]) -> int:
+    if workers is None:
+        return default_workers()
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    return workers
+
+
+class AbstractExecutor:
+
+    def map(self, camera, scene, tiles: Sequence[Tile]) -> Iterator[tuple[Tile, array]]:
+        raise NotImplementedError
+
+    def render(self, camera, scene, tiles: Sequence[Tile], canvas: Canvas):
+        """Render the tiles into the canvas, or anything else with a matching blit such as a sink."""
+        for tile, buffer in self.map(camera, scene, tiles):
+            canvas.blit(*tile, buffer)
+
+
+class SerialExecutor(AbstractExecutor):
+    """Renders every tile in the calling thread; no start up cost, for tests and previews."""
+
+    def map(self, camera, scene, tiles: Sequence[Tile]) -> Iterator[tuple[Tile, array]]:
+        for tile in tiles:
+            yield tile, render_tile(camera, scene, tile)
+
+
+class ThreadExecutor(AbstractExecutor):
+    """
+    Renders tiles on a pool of threads sharing the scene.
+
+    Only worth it on free-threaded Python builds or with hulls that release
+    the GIL; on other builds the threads take turns.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = _check_workers(workers)
+
+    def map(self, camera, scene, tiles: Sequence[Tile]) -> Iterator[tuple[Tile, array]]:
+        with ThreadPoolExecutor(self.workers) as pool:
+            futures = {pool.submit(render_tile, camera, scene, tile): tile for tile in tiles}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+
+class ProcessExecutor(AbstractExecutor):
+    """
+    Renders tiles on a multiprocessing pool started for each render.
+
+    The scene is published once as a SharedScene that workers attach to when
+    they start, alongside the camera; workers then take tiles one at a time.
+
+    With shared_framebuffer, render() also gives the workers a
+    SharedFramebuffer to write finished tiles into, and only tile
+    coordinates come back; the image is copied into the canvas at the end.
+    A canvas with mmap storage is always written this way, directly, by
+    workers opening its file.
+    """
+
+    def __init__(self, workers: Optional[int] = None, shared_framebuffer: bool = False):
+        self.workers = _check_workers(workers)
+        self.shared_framebuffer = shared_framebuffer
+
+    def map(self, camera, scene, tiles: Sequence[Tile]) -> Iterator[tuple[Tile, array]]:
+        with SharedScene(scene) as shared:
+            with Pool(self.workers, initializer=_initialize_worker, initargs=(camera, shared.name)) as pool:
+                yield from pool.imap_unordered(_render_worker_tile, tiles)
+
+    def render(self, camera, scene, tiles: Sequence[Tile], canvas: Canvas):
+        if getattr(canvas, "storage", None) == "mmap":
+            # Workers open the canvas file themselves and write tiles in place.
+            canvas.flush()
+            self._write(camera, scene, tiles, canvas_path=str(canvas.path))
+            return
+        if not self.shared_framebuffer:
+            return super().render(camera, scene, tiles, canvas)
+        with SharedFramebuffer(canvas.width, canvas.height) as framebuffer:
+            self._write(camera, scene, tiles, framebuffer=(framebuffer.name, canvas.width, canvas.height))
+            for tile in tiles:
+                canvas.blit(*tile, framebuffer.read(tile))
+
+    def _write(
+            self, camera, scene, tiles: Sequence[Tile],
+            framebuffer: Optional[tuple[str, int, int]] = None, canvas_path: Optional[str] = None
+    ):
+        """Have workers write tiles straight into a shared framebuffer or a mapped canvas file."""
+        with SharedScene(scene) as shared:
+            initargs = (camera, shared.name, framebuffer, canvas_path)
+            with Pool(self.workers, initializer=_initialize_worker, initargs=initargs) as pool:
+                for _ in pool.imap_unordered(_write_worker_tile, tiles):
+                    pass
+
+
+class FuturesExecutor(AbstractExecutor):
+    """
+    Renders tiles on a caller supplied concurrent.futures.Executor.
+
+    The executor is borrowed, not shut down. Each tile is submitted with the
+    camera and scene, so a process based executor pickles them per tile.
+    """
+
+    def __init__(self, executor: Executor):
+        self.executor = executor
+
+    def map(self, camera, scene, tiles: Sequence[Tile]) -> Iterator[tuple[Tile, array]]:
+        futures = {self.executor.submit(render_tile, camera, scene, tile): tile for tile in tiles}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+_named = {
+    "serial": SerialExecutor,
+    "thread": ThreadExecutor,
+    "process": ProcessExecutor,
+}
+
+
+def resolve(
+        executor: Union[None, str, AbstractExecutor, Executor] = None, workers: Optional[int] = None
+) -> AbstractExecutor:
+    """
+    The back end for a render.
+
+    executor may be a back end, a concurrent.futures.Executor, or one of the
+    names "serial", "thread" and "process". None means "process", a pool of
+    worker processes as Camera.render has always used; pass "serial" to
+    render in the calling process. workers sets the pool size and is only
+    accepted with "thread", "process" or None.
+    """
+    if executor is None:
+        executor = "process"
+    if isinstance(executor, str):
+        try:
+            backend = _named[executor]
+        except KeyError:
+            raise ValueError(f"Unknown executor {executor!r}; expected one of {', '.join(_named)}.") from None
+        if backend is SerialExecutor:
+            if workers is not None:
+                raise ValueError("The serial executor does not take workers.")
+            return backend()
+        return backend(workers)
+    if workers is not None:
+        raise ValueError("workers only applies to the named pooled executors; size the given executor instead.")
+    if isinstance(executor, AbstractExecutor):
+        return executor
+    if isinstance(executor, Executor):
+        return FuturesExecutor(executor)
+    raise TypeError(f"Cannot render with {executor!r}.")
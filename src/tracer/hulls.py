@@ -1,14 +1,20 @@
 from dataclasses import dataclass
 from math import sqrt
+from math import isclose
+from typing import ClassVar, NamedTuple, Optional, Union
+from weakref import ref
+
+from .bvh import BoundingBox
 
 from .lighting import (
+    HitBuffer,
     Intersection,
     Intersections,
     Light,
     Material,
     Ray
 )
-from .matrices import Matrix
+from .matrices import Matrix, Transformable
 from .shared import EPSILON, number
 from .tuples import (
     BLACK,
@@ -19,29 +25,199 @@ from .tuples import (
 
 __all__ = [
     "AbstractHull",
+    "FoldedPlane",
+    "FoldedSphere",
     "Plane",
     "Sphere",
 ]
 
 
+class FoldedSphere(NamedTuple):
+    """A sphere placed directly in world space, intersected without transforming the ray."""
+    center: Vector
+    radius: number
+
+    def distances(self, ray: Ray) -> tuple[number, ...]:
+        ox, oy, oz, _ = ray.origin
+        dx, dy, dz, _ = ray.direction
+        cx, cy, cz, _ = self.center
+        ox -= cx
+        oy -= cy
+        oz -= cz
+
+        a = dx * dx + dy * dy + dz * dz
+        b = 2 * (dx * ox + dy * oy + dz * oz)
+        c = ox * ox + oy * oy + oz * oz - self.radius * self.radius
+
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return ()
+
+        root = sqrt(discriminant)
+        return (-b - root) / (2 * a), (-b + root) / (2 * a)
+
+    def normal_at(self, point: Vector) -> Vector:
+        return Vector.vector(
+            point.x - self.center.x,
+            point.y - self.center.y,
+            point.z - self.center.z
+        ).normalize()
+
+    def bounds(self) -> BoundingBox:
+        x, y, z, _ = self.center
+        radius = self.radius
+        return BoundingBox(x - radius, y - radius, z - radius, x + radius, y + radius, z + radius)
+
+
+class FoldedPlane(NamedTuple):
+    """The plane of points p where normal . p == offset, in world space."""
+    normal: Vector
+    offset: number
+
+    def distances(self, ray: Ray) -> tuple[number, ...]:
+        normal = self.normal
+        denominator = normal.dot(ray.direction)
+        if abs(denominator) < EPSILON:
+            return ()
+        return (self.offset - normal.dot(ray.origin)) / denominator,
+
+    def normal_at(self, point: Vector) -> Vector:
+        return self.normal
+
+    def bounds(self) -> None:
+        return None
+
+
+Folded = Union[FoldedSphere, FoldedPlane]
+
+
+def _similarity_scale(transform: Matrix) -> Optional[float]:
+    """
+    The scale factor of a transform made only of rotation, uniform scale and
+    translation, or None for anything else (shear, non-uniform scale, projection).
+    """
+    if not transform.is_affine:
+        return None
+    a, b, c, _, d, e, f, _, g, h, i, _ = transform.data[:12]
+    columns = ((a, d, g), (b, e, h), (c, f, i))
+    squared = columns[0][0] ** 2 + columns[0][1] ** 2 + columns[0][2] ** 2
+    tolerance = squared * 1e-9
+    for row, left in enumerate(columns):
+        for column, right in enumerate(columns):
+            expected = squared if row == column else 0
+            dot = left[0] * right[0] + left[1] * right[1] + left[2] * right[2]
+            if not isclose(dot, expected, abs_tol=tolerance):
+                return None
+    return sqrt(squared)
+
+
 @dataclass
-class AbstractHull:
+class AbstractHull(Transformable):
     transform: Matrix = Matrix.identity
     material: Material = Material()
 
+    _geometry_fields: ClassVar[tuple[str, ...]] = ("transform",)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._geometry_fields:
+            self.__dict__.pop("_folded", None)
+            # Tell the worlds holding this hull, so they rebuild their BVH.
+            for owner in self.__dict__.get("_owners", ()):
+                world = owner()
+                if world is not None:
+                    world._geometry_changed()
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("_folded", None)
+        state.pop("_owners", None)
+        return state
+
+    def _watched_by(self, world):
+        """Call world._geometry_changed() whenever this hull's geometry changes, for as long as world lives."""
+        owners = self.__dict__.setdefault("_owners", [])
+        if not any(owner() is world for owner in owners):
+            owners.append(ref(world))
+
+    def _fold(self) -> Optional[Folded]:
+        return None
+
+    @property
+    def folded(self) -> Optional[Folded]:
+        """
+        This hull as an analytic world space primitive, when its transform allows.
+
+        Folded hulls are intersected and give normals without any ray or
+        point transformation; other hulls fall back to the matrix path.
+        Computed on first use after the geometry last changed.
+        """
+        try:
+            return self.__dict__["_folded"]
+        except KeyError:
+            folded = self.__dict__["_folded"] = self._fold()
+            return folded
+
+    def _world_distances(self, ray: Ray) -> tuple[number, ...]:
+        folded = self.folded
+        if folded is not None:
+            return folded.distances(ray)
+        return self._distances(ray.transform(self.inverse_transform))
+
+    def _bounds(self) -> Optional[BoundingBox]:
+        return None
+
+    def bounds(self) -> Optional[BoundingBox]:
+        """World space bounds, or None for hulls without finite bounds."""
+        folded = self.folded
+        if folded is not None:
+            return folded.bounds()
+        local_bounds = self._bounds()
+        if local_bounds is None:
+            return None
+        return local_bounds.transform(self.transform)
+
     def _intersects(self, ray: Ray) -> Intersections[Intersection]:
         raise NotImplementedError
 
     def intersects(self, ray: Ray) -> Intersections:
-        return self._intersects(ray.transform(self.transform.inverse()))
+        return self._intersects(ray.transform(self.inverse_transform))
+
+    def _distances(self, ray: Ray) -> tuple[number, ...]:
+        """Hit distances along an object space ray, without building Intersections."""
+        return tuple(intersection.distance for intersection in self._intersects(ray))
+
+    def record_hits(self, ray: Ray, buffer: HitBuffer):
+        """Write every hit distance along the ray into the buffer."""
+        distances = self._world_distances(ray)
+        if distances:
+            buffer.add(self, distances)
+
+    def closest_distance(self, ray: Ray, t_max: number) -> Optional[number]:
+        """The nearest hit distance in (0, t_max), or None when there is none."""
+        closest = None
+        for distance in self._world_distances(ray):
+            if 0 < distance < t_max:
+                closest = t_max = distance
+        return closest
+
+    def occludes(self, ray: Ray, t_max: number) -> bool:
+        """Whether the ray hits this hull anywhere in (EPSILON, t_max)."""
+        for distance in self._world_distances(ray):
+            if EPSILON < distance < t_max:
+                return True
+        return False
 
     def _normal_at(self, point: Vector) -> Vector:
         raise NotImplementedError
 
     def normal_at(self, point: Vector) -> Vector:
-        local_point = self.transform.inverse() * point
+        folded = self.folded
+        if folded is not None:
+            return folded.normal_at(point)
+        local_point = self.inverse_transform.transform_point(point)
         local_normal = self._normal_at(local_point)
-        x, y, z, _ = self.transform.inverse().transpose() * local_normal
+        x, y, z, _ = self.normal_transform.transform_vector(local_normal)
         return Vector.vector(x, y, z).normalize()
 
     def lighting(
@@ -64,6 +240,9 @@ class AbstractHull:
 
         diffuse = effective_color * self.material.diffuse * light_v_dot_surface_normal
 
+        if not self.material.specular:
+            return ambient + diffuse + BLACK
+
         reflection_vector = (-light_vector).reflect(surface_normal)
         reflect_dot_eye = reflection_vector.dot(eye_vector)
 
@@ -81,7 +260,23 @@ class Sphere(AbstractHull):
     origin: Vector = Vector.point(0, 0, 0)
     radius: number = 1
 
+    _geometry_fields: ClassVar[tuple[str, ...]] = ("transform", "origin")
+
+    def _fold(self) -> Optional[FoldedSphere]:
+        # The unit sphere stays a sphere under rotation, uniform scale and translation.
+        scale = _similarity_scale(self.transform)
+        if scale is None:
+            return None
+        return FoldedSphere(self.transform.transform_point(self.origin), scale)
+
+    def _bounds(self) -> BoundingBox:
+        x, y, z, _ = self.origin
+        return BoundingBox(x - 1, y - 1, z - 1, x + 1, y + 1, z + 1)
+
     def _intersects(self, ray: Ray) -> Intersections[Intersection]:
+        return Intersections(Intersection(distance, self) for distance in self._distances(ray))
+
+    def _distances(self, ray: Ray) -> tuple[number, ...]:
         sphere_to_ray = ray.origin - self.origin
 
         a = ray.direction.dot(ray.direction)
@@ -90,12 +285,10 @@ class Sphere(AbstractHull):
 
         discriminant = b ** 2 - 4 * a * c
         if discriminant < 0:
-            return Intersections()
-
-        intersection_1 = (-b - sqrt(discriminant)) / (2 * a)
-        intersection_2 = (-b + sqrt(discriminant)) / (2 * a)
+            return ()
 
-        return Intersections((Intersection(intersection_1, self), Intersection(intersection_2, self)))
+        root = sqrt(discriminant)
+        return (-b - root) / (2 * a), (-b + root) / (2 * a)
 
     def _normal_at(self, object_point: Vector) -> Vector:
         return object_point - self.origin
@@ -104,10 +297,23 @@ class Sphere(AbstractHull):
 @dataclass
 class Plane(AbstractHull):
 
+    def _fold(self) -> Optional[FoldedPlane]:
+        # Only rigid transforms keep the distance along the normal, and with it
+        # the parallel-ray threshold, identical to the object space test.
+        scale = _similarity_scale(self.transform)
+        if scale is None or not isclose(scale, 1, rel_tol=1e-9):
+            return None
+        normal = self.transform.transform_vector(Vector.vector(0, 1, 0))
+        normal = Vector.vector(normal.x, normal.y, normal.z)
+        return FoldedPlane(normal, normal.dot(self.transform.transform_point(Vector.point(0, 0, 0))))
+
     def _intersects(self, ray: Ray) -> Intersections[Intersection]:
+        return Intersections(Intersection(distance, self) for distance in self._distances(ray))
+
+    def _distances(self, ray: Ray) -> tuple[number, ...]:
         if abs(ray.direction.y) < EPSILON:
-            return Intersections()
-        return Intersections((Intersection((-ray.origin.y) / ray.direction.y, self),))
+            return ()
+        return (-ray.origin.y) / ray.direction.y,
 
     def _normal_at(self, point: Vector) -> Vector:
         return Vector.vector(0, 1, 0)
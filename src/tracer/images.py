@@ -0,0 +1,174 @@
+"""
+Image file writers used by Canvas.save.
+
+Every writer takes a binary stream, writes its header straight away and is
+then fed one image row at a time as packed r, g, b values, in file order:
+top to bottom, except for bottom_up formats (PFM). close() writes any
+trailer but leaves the stream open.
+"""
+from __future__ import annotations
+
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from struct import pack
+from typing import BinaryIO, ClassVar, Optional, Sequence, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = [
+    "FORMATS",
+    "ImageWriter",
+    "P3Writer",
+    "P6Writer",
+    "PFMWriter",
+    "PNGWriter",
+    "quantize",
+    "writer_for",
+]
+
+_DECIMALS = [str(value) for value in range(256)]
+
+
+def quantize(values: Sequence[float]) -> bytes:
+    """
+    Clamp colour channels to [0, 1] and scale them to bytes, rounding half to even.
+
+    Runs as one vectorised operation when NumPy is installed, and as a single
+    comprehension over the values otherwise.
+    """
+    if numpy is not None:
+        channels = numpy.clip(numpy.asarray(values, dtype=float), 0, 1)
+        return numpy.rint(channels * 255).astype(numpy.uint8).tobytes()
+    return bytes([0 if value <= 0 else 255 if value >= 1 else round(value * 255) for value in values])
+
+
+class ImageWriter:
+    bottom_up: ClassVar[bool] = False
+
+    def __init__(self, stream: BinaryIO, width: int, height: int):
+        self.stream = stream
+        self.width = width
+        self.height = height
+
+    def write_row(self, values: Sequence[float]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class P3Writer(ImageWriter):
+    """ASCII PPM; each image row starts a new line and lines stay within 70 characters."""
+
+    def __init__(self, stream: BinaryIO, width: int, height: int):
+        super().__init__(stream, width, height)
+        stream.write(f"P3\n{width} {height}\n255\n".encode("ascii"))
+
+    def write_row(self, values: Sequence[float]):
+        lines = []
+        line = []
+        characters = 0
+        for channel in quantize(values):
+            text = _DECIMALS[channel]
+            if characters + len(text) + len(line) > 70:
+                lines.append(" ".join(line))
+                line = []
+                characters = 0
+            line.append(text)
+            characters += len(text)
+        lines.append(" ".join(line))
+        self.stream.write(("\n".join(lines) + "\n").encode("ascii"))
+
+
+class P6Writer(ImageWriter):
+    """Binary PPM, one byte per channel."""
+
+    def __init__(self, stream: BinaryIO, width: int, height: int):
+        super().__init__(stream, width, height)
+        stream.write(f"P6\n{width} {height}\n255\n".encode("ascii"))
+
+    def write_row(self, values: Sequence[float]):
+        self.stream.write(quantize(values))
+
+
+class PFMWriter(ImageWriter):
+    """Portable float map: unclamped little endian float32 channels, bottom row first."""
+
+    bottom_up = True
+
+    def __init__(self, stream: BinaryIO, width: int, height: int):
+        super().__init__(stream, width, height)
+        stream.write(f"PF\n{width} {height}\n-1.0\n".encode("ascii"))
+
+    def write_row(self, values: Sequence[float]):
+        row = array("f", values)
+        if sys.byteorder == "big":
+            row.byteswap()
+        self.stream.write(row.tobytes())
+
+
+class PNGWriter(ImageWriter):
+    """8 bit RGB PNG, compressed row by row and written out as IDAT chunks as it fills."""
+
+    chunk_size = 1 << 16
+
+    def __init__(self, stream: BinaryIO, width: int, height: int, level: int = 6):
+        super().__init__(stream, width, height)
+        self._compressor = zlib.compressobj(level)
+        self._pending = bytearray()
+        stream.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes):
+        self.stream.write(pack(">I", len(data)))
+        self.stream.write(kind)
+        self.stream.write(data)
+        self.stream.write(pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def _flush(self, final: bool = False):
+        while len(self._pending) >= self.chunk_size or (final and self._pending):
+            self._chunk(b"IDAT", bytes(self._pending[:self.chunk_size]))
+            del self._pending[:self.chunk_size]
+
+    def write_row(self, values: Sequence[float]):
+        # Filter type 0 (none) for every scanline.
+        self._pending += self._compressor.compress(b"\x00" + quantize(values))
+        self._flush()
+
+    def close(self):
+        self._pending += self._compressor.flush()
+        self._flush(final=True)
+        self._chunk(b"IEND", b"")
+
+
+FORMATS = {
+    "p3": P3Writer,
+    "p6": P6Writer,
+    "pfm": PFMWriter,
+    "png": PNGWriter,
+}
+
+_extensions = {
+    ".ppm": "p3",
+    ".pfm": "pfm",
+    ".png": "png",
+}
+
+
+def writer_for(file_path: Union[Path, str], format: Optional[str] = None) -> type[ImageWriter]:
+    """
+    The writer for a format name ("p3", "p6", "pfm" or "png"), or else for
+    the file's extension. .ppm files, and files with any other or no
+    extension, are ASCII P3 unless a format is given.
+    """
+    if format is None:
+        format = _extensions.get(Path(file_path).suffix.lower(), "p3")
+    try:
+        return FORMATS[format.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown image format {format!r}; expected one of {', '.join(FORMATS)}.") from None
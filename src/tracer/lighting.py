@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+from array import array
 from collections import UserList
 from dataclasses import dataclass
-from typing import Optional, Protocol
+from functools import cached_property
+from math import inf
+from typing import Iterable, Optional, Protocol, TYPE_CHECKING
 
 from .shared import EPSILON, number
 from .tuples import Vector, Color
 from .matrices import Matrix
 
+if TYPE_CHECKING:
+    from .bvh import BoundingBox
+
 black = Color(0, 0, 0)
 
 
 class Hull(Protocol):
     transform: Matrix
+    inverse_transform: Matrix
+    normal_transform: Matrix
     material: Material
 
     def intersects(self, ray: Ray) -> Intersections[Intersection]:
@@ -21,6 +29,18 @@ class Hull(Protocol):
     def normal_at(self, point: Vector) -> Vector:
         ...
 
+    def bounds(self) -> Optional[BoundingBox]:
+        ...
+
+    def record_hits(self, ray: Ray, buffer: HitBuffer):
+        ...
+
+    def closest_distance(self, ray: Ray, t_max: number) -> Optional[number]:
+        ...
+
+    def occludes(self, ray: Ray, t_max: number) -> bool:
+        ...
+
     def lighting(
             self, light: Light, surface_position: Vector, eye_vector: Vector, surface_normal: Vector,
             in_shadow: bool = False
@@ -34,15 +54,46 @@ class Pattern(Protocol):
         ...
 
 
-@dataclass
 class Computations:
-    distance: number
-    hull: Hull
-    point: Vector
-    eye_vector: Vector
-    normal_vector: Vector
-    over_point: Vector
-    inside: bool = False
+    """
+    Values used to shade a hit, each computed on first access.
+
+    Shading paths only pay for the fields they read; the normal (and with it
+    the hull's matrix work) is only found when normal_vector, inside or
+    over_point is needed. New fields are added as further cached properties.
+    """
+
+    def __init__(self, distance: number, hull: Hull, ray: Ray):
+        self.distance = distance
+        self.hull = hull
+        self.ray = ray
+
+    @cached_property
+    def point(self) -> Vector:
+        return self.ray.position(self.distance)
+
+    @cached_property
+    def eye_vector(self) -> Vector:
+        return -self.ray.direction
+
+    @cached_property
+    def surface_normal(self) -> Vector:
+        """The hull's outward normal, before flipping for inside hits."""
+        return self.hull.normal_at(self.point)
+
+    @cached_property
+    def inside(self) -> bool:
+        return self.surface_normal.dot(self.eye_vector) < 0
+
+    @cached_property
+    def normal_vector(self) -> Vector:
+        if self.inside:
+            return -self.surface_normal
+        return self.surface_normal
+
+    @cached_property
+    def over_point(self) -> Vector:
+        return self.point + self.normal_vector * EPSILON
 
 
 @dataclass
@@ -51,32 +102,68 @@ class Intersection:
     hull: Hull
 
     def prepare_computations(self, ray: Ray) -> Computations:
-        point = ray.position(self.distance)
-        eye_vector = -ray.direction
-        normal_vector = self.hull.normal_at(point)
-        inside = False
-        if normal_vector.dot(eye_vector) < 0:
-            inside = True
-            normal_vector = -normal_vector
-        over_point = point + normal_vector * EPSILON
-
-        return Computations(
-            self.distance,
-            self.hull,
-            point,
-            eye_vector,
-            normal_vector,
-            over_point,
-            inside
-        )
+        return Computations(self.distance, self.hull, ray)
 
 
 class Intersections(UserList):
     def hit(self) -> Optional[Intersection]:
-        try:
-            return sorted((i for i in self if i.distance > 0), key=lambda x: x.distance)[0]
-        except IndexError:
+        return min((i for i in self if i.distance > 0), key=lambda x: x.distance, default=None)
+
+
+class HitBuffer:
+    """
+    Compact intersection records: parallel arrays of distances and hull indices.
+
+    Hulls write their hit distances straight into the buffer (see
+    AbstractHull.record_hits), so no Intersection is created until a caller
+    asks for one through hit() or intersections().
+    """
+
+    __slots__ = ("distances", "hull_indices", "hulls")
+
+    def __init__(self):
+        self.distances = array("d")
+        self.hull_indices = array("L")
+        self.hulls: list[Hull] = []
+
+    def __len__(self):
+        return len(self.distances)
+
+    def add(self, hull: Hull, distances: Iterable[number]):
+        index = len(self.hulls)
+        self.hulls.append(hull)
+        for distance in distances:
+            self.distances.append(distance)
+            self.hull_indices.append(index)
+
+    def clear(self):
+        del self.distances[:]
+        del self.hull_indices[:]
+        self.hulls.clear()
+
+    def nearest(self) -> Optional[int]:
+        """Position of the nearest positive distance, or None."""
+        nearest = None
+        best = inf
+        for position, distance in enumerate(self.distances):
+            if 0 < distance < best:
+                nearest = position
+                best = distance
+        return nearest
+
+    def record(self, position: int) -> Intersection:
+        return Intersection(self.distances[position], self.hulls[self.hull_indices[position]])
+
+    def hit(self) -> Optional[Intersection]:
+        position = self.nearest()
+        if position is None:
             return None
+        return self.record(position)
+
+    def intersections(self) -> Intersections:
+        """Every record as an Intersection, sorted by distance."""
+        order = sorted(range(len(self.distances)), key=self.distances.__getitem__)
+        return Intersections(self.record(position) for position in order)
 
 
 @dataclass
@@ -92,8 +179,8 @@ class Ray:
 
     def transform(self, transform: Matrix) -> Ray:
         return Ray(
-            transform * self.origin,
-            transform * self.direction
+            transform.transform_point(self.origin),
+            transform.transform_vector(self.direction)
         )
 
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections import UserList
+from functools import cached_property
 from itertools import chain, product
 from math import isclose, cos, sin
 
@@ -9,11 +9,26 @@ from .tuples import Vector
 
 
 __all__ = [
-    "Matrix"
+    "Matrix",
+    "Matrix4",
+    "Transformable"
 ]
 
 
-class Matrix(UserList):
+class Matrix:
+    """
+    An immutable square matrix.
+
+    Derived values (determinant, inverse and transpose) are computed once
+    and remembered, so every hull sharing a transform shares its inverse.
+    Equality is approximate (within EPSILON), which no hash of the entries
+    can agree with, so matrices hash on their size alone. They can be used
+    as dictionary keys, and nearly equal matrices find each other, but a
+    mapping holding many matrices of one size is searched linearly; key
+    large mappings on ``data`` instead.
+    """
+
+    __slots__ = ("data", "size", "_determinant", "_inverse", "_transpose")
 
     _size_map = {
         4: 2,
@@ -24,23 +39,52 @@ class Matrix(UserList):
     identity: Matrix
 
     def __init__(self, *items):
-        super().__init__(items)
-        if not len(self) in self._size_map.keys():
+        if not len(items) in self._size_map.keys():
             raise ValueError("Only supports square matrices.")
-        self.size = self._size_map[len(self)]
-        self._invertible = None
+        self._remember("data", items)
+        self._remember("size", self._size_map[len(items)])
+        self._remember("_determinant", None)
+        self._remember("_inverse", None)
+        self._remember("_transpose", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def _remember(self, name, value):
+        object.__setattr__(self, name, value)
+
+    @staticmethod
+    def _build(*values) -> Matrix:
+        if len(values) == 16:
+            return Matrix4(*values)
+        return Matrix(*values)
+
+    def __reduce__(self):
+        return type(self), self.data
+
+    def __repr__(self):
+        return f"{type(self).__name__}{self.data!r}"
+
+    def __len__(self):
+        return len(self.data)
 
     def __getitem__(self, item):
         y, x = item
-        return super().__getitem__(x + (y * self.size))
+        return self.data[x + (y * self.size)]
 
     def __eq__(self, other):
         if len(self) != len(other):
             return False
         return all(isclose(l, r, abs_tol=EPSILON) for l, r in zip(self, other))
 
+    def __hash__(self):
+        return hash(self.size)
+
     def __iter__(self):
-        yield from self.data
+        return iter(self.data)
 
     def __matmul__(self, other):
         if self.size != other.size:
@@ -48,13 +92,20 @@ class Matrix(UserList):
         values = []
         for x, y in product(range(self.size), range(self.size)):
             values.append(sum(v1 * v2 for v1, v2 in zip(self.row(x), other.column(y))))
-        return Matrix(*values)
+        return self._build(*values)
 
     def __mul__(self, _tuple: Vector):
+        products = (sum(a * b for a, b in zip(_tuple, row)) for row in self.rows)
         if self.size == 4:
-            return Vector(*(_tuple.dot(row) for row in self.rows))
+            return Vector(*products)
         else:
-            return Vector(*(_tuple.dot(row) for row in self.rows), 0)
+            return Vector(*products, 0)
+
+    def transform_point(self, point: Vector) -> Vector:
+        return self * Vector.point(point.x, point.y, point.z)
+
+    def transform_vector(self, vector: Vector) -> Vector:
+        return self * Vector.vector(vector.x, vector.y, vector.z)
 
     @property
     def rows(self):
@@ -75,12 +126,28 @@ class Matrix(UserList):
             yield self[x, column]
 
     def transpose(self) -> Matrix:
-        return Matrix(*chain(*self.columns))
+        if self._transpose is None:
+            transpose = self._build(*chain(*self.columns))
+            transpose._remember("_transpose", self)
+            self._remember("_transpose", transpose)
+        return self._transpose
 
     def determinant(self):
+        if self._determinant is None:
+            if self.size == 2:
+                a, b, c, d = self.data
+                determinant = a * d - b * c
+            elif self.size == 3:
+                determinant = _determinant_3x3(*self.data)
+            else:
+                determinant = _determinant_4x4(*self.data)
+            self._remember("_determinant", determinant)
+        return self._determinant
+
+    def cofactor_determinant(self):
+        """Reference determinant by cofactor expansion along the first row."""
         if self.size == 2:
-            a, b, c, d = self.data
-            return a * d - b * c
+            return self.determinant()
         return sum(v * self.cofactor(0, y) for y, v in enumerate(self.row(0)))
 
     def submatrix(self, row_index, column_index):
@@ -108,79 +175,69 @@ class Matrix(UserList):
 
     @property
     def invertible(self):
-        if self._invertible is None:
-            self._invertible = bool(self.determinant())
-        return self._invertible
+        return bool(self.determinant())
 
     def inverse(self):
+        if self._inverse is None:
+            if self.size == 2:
+                a, b, c, d = self.data
+                determinant = a * d - b * c
+                inverse = Matrix(d / determinant, -b / determinant, -c / determinant, a / determinant)
+            elif self.size == 3:
+                inverse = Matrix(*_inverse_3x3(*self.data))
+            else:
+                inverse = Matrix4(*_inverse_4x4(*self.data))
+            inverse._remember("_inverse", self)
+            self._remember("_inverse", inverse)
+        return self._inverse
+
+    def cofactor_inverse(self):
+        """Reference inverse built from the cofactor matrix, kept for testing the closed forms."""
         cofactor_matrix = Matrix(*(
             self.cofactor(row, column)
             for row, column
             in product(range(self.size), range(self.size))
         ))
-        determinate = self.determinant()
-        return Matrix(*(v / determinate for v in cofactor_matrix.transpose()))
-
-    def translate(self, x: number, y: number, z:number) -> Matrix:
-        transform = Matrix(
-            1, 0, 0, x,
-            0, 1, 0, y,
-            0, 0, 1, z,
-            0, 0, 0, 1
-        )
-        return transform @ self
+        determinate = self.cofactor_determinant()
+        return self._build(*(v / determinate for v in cofactor_matrix.transpose()))
+
+    def translate(self, x: number, y: number, z: number) -> Matrix:
+        return self._chain(Matrix4.translation(x, y, z))
 
     def scale(self, x: number, y: number, z: number) -> Matrix:
-        transform = Matrix(
-            x, 0, 0, 0,
-            0, y, 0, 0,
-            0, 0, z, 0,
-            0, 0, 0, 1
-        )
-        return transform @ self
+        return self._chain(Matrix4.scaling(x, y, z))
 
     def rotate_x(self, radians: number) -> Matrix:
-        transform = Matrix(
-            1, 0, 0, 0,
-            0, cos(radians), -sin(radians), 0,
-            0, sin(radians), cos(radians), 0,
-            0, 0, 0, 1
-        )
-        return transform @ self
+        return self._chain(Matrix4.rotation_x(radians))
 
     def rotate_y(self, radians: number) -> Matrix:
-        transform = Matrix(
-            cos(radians), 0, sin(radians), 0,
-            0, 1, 0, 0,
-            -sin(radians), 0, cos(radians), 0,
-            0, 0, 0, 1
-        )
-        return transform @ self
+        return self._chain(Matrix4.rotation_y(radians))
 
     def rotate_z(self, radians: number) -> Matrix:
-        transform = Matrix(
-            cos(radians), -sin(radians), 0, 0,
-            sin(radians), cos(radians), 0, 0,
-            0, 0, 1, 0,
-            0, 0, 0, 1
-        )
-        return transform @ self
+        return self._chain(Matrix4.rotation_z(radians))
 
     def shear(self, xy: number, xz: number, yx: number, yz: number, zx: number, zy: number) -> Matrix:
-        transform = Matrix(
-            1, xy, xz, 0,
-            yx, 1, yz, 0,
-            zx, zy, 1, 0,
-            0, 0, 0, 1
-        )
-        return transform @ self
+        return self._chain(Matrix4.shearing(xy, xz, yx, yz, zx, zy))
+
+    def _chain(self, step: Matrix4) -> Matrix:
+        # Steps carry exact inverses, so a chain that starts from a matrix with
+        # a known inverse keeps one by composing the step inverses in reverse.
+        # Singular steps carry none, and neither does anything built on them.
+        transform = step @ self
+        if self._inverse is not None and step._inverse is not None:
+            _pair_inverses(transform, self._inverse @ step._inverse)
+        return transform
+
+    @property
+    def is_affine(self) -> bool:
+        return self.size == 4 and self.data[12:] == (0, 0, 0, 1)
 
     @staticmethod
     def view(from_point: Vector, to_point: Vector, up_vector: Vector) -> Matrix:
         forward = (to_point - from_point).normalize()
         left = forward.cross(up_vector.normalize())
         true_up = left.cross(forward)
-        orientation = Matrix(
+        orientation = Matrix4(
             left.x, left.y, left.z, 0,
             true_up.x, true_up.y, true_up.z, 0,
             -forward.x, -forward.y, -forward.z, 0,
@@ -190,9 +247,356 @@ class Matrix(UserList):
         return orientation @ Matrix.identity.translate(-from_point.x, -from_point.y, -from_point.z)
 
 
-Matrix.identity = Matrix(
+class Matrix4(Matrix):
+    """
+    A 4x4 matrix with unrolled arithmetic.
+
+    Entries are kept flat and row major. Every 4x4 result produced by
+    Matrix (products, inverses, transposes and the transform helpers) is a
+    Matrix4, so ray transformation never goes through the generic loops.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *items):
+        if len(items) != 16:
+            raise ValueError("Matrix4 requires exactly 16 values.")
+        super().__init__(*items)
+
+    @classmethod
+    def with_inverse(cls, values, inverse_values) -> Matrix4:
+        """Build a matrix whose inverse is already known, skipping general inversion."""
+        transform = cls(*values)
+        _pair_inverses(transform, cls(*inverse_values))
+        return transform
+
+    @classmethod
+    def translation(cls, x: number, y: number, z: number) -> Matrix4:
+        return cls.with_inverse(
+            (
+                1, 0, 0, x,
+                0, 1, 0, y,
+                0, 0, 1, z,
+                0, 0, 0, 1
+            ),
+            (
+                1, 0, 0, -x,
+                0, 1, 0, -y,
+                0, 0, 1, -z,
+                0, 0, 0, 1
+            )
+        )
+
+    @classmethod
+    def scaling(cls, x: number, y: number, z: number) -> Matrix4:
+        if not (x and y and z):
+            # Flattening onto a plane has no inverse to pair.
+            return cls(
+                x, 0, 0, 0,
+                0, y, 0, 0,
+                0, 0, z, 0,
+                0, 0, 0, 1
+            )
+        return cls.with_inverse(
+            (
+                x, 0, 0, 0,
+                0, y, 0, 0,
+                0, 0, z, 0,
+                0, 0, 0, 1
+            ),
+            (
+                1 / x, 0, 0, 0,
+                0, 1 / y, 0, 0,
+                0, 0, 1 / z, 0,
+                0, 0, 0, 1
+            )
+        )
+
+    @classmethod
+    def rotation_x(cls, radians: number) -> Matrix4:
+        c, s = cos(radians), sin(radians)
+        return cls.with_inverse(
+            (
+                1, 0, 0, 0,
+                0, c, -s, 0,
+                0, s, c, 0,
+                0, 0, 0, 1
+            ),
+            (
+                1, 0, 0, 0,
+                0, c, s, 0,
+                0, -s, c, 0,
+                0, 0, 0, 1
+            )
+        )
+
+    @classmethod
+    def rotation_y(cls, radians: number) -> Matrix4:
+        c, s = cos(radians), sin(radians)
+        return cls.with_inverse(
+            (
+                c, 0, s, 0,
+                0, 1, 0, 0,
+                -s, 0, c, 0,
+                0, 0, 0, 1
+            ),
+            (
+                c, 0, -s, 0,
+                0, 1, 0, 0,
+                s, 0, c, 0,
+                0, 0, 0, 1
+            )
+        )
+
+    @classmethod
+    def rotation_z(cls, radians: number) -> Matrix4:
+        c, s = cos(radians), sin(radians)
+        return cls.with_inverse(
+            (
+                c, -s, 0, 0,
+                s, c, 0, 0,
+                0, 0, 1, 0,
+                0, 0, 0, 1
+            ),
+            (
+                c, s, 0, 0,
+                -s, c, 0, 0,
+                0, 0, 1, 0,
+                0, 0, 0, 1
+            )
+        )
+
+    @classmethod
+    def shearing(cls, xy: number, xz: number, yx: number, yz: number, zx: number, zy: number) -> Matrix4:
+        if not _determinant_3x3(1, xy, xz, yx, 1, yz, zx, zy, 1):
+            return cls(
+                1, xy, xz, 0,
+                yx, 1, yz, 0,
+                zx, zy, 1, 0,
+                0, 0, 0, 1
+            )
+        i00, i01, i02, i10, i11, i12, i20, i21, i22 = _inverse_3x3(1, xy, xz, yx, 1, yz, zx, zy, 1)
+        return cls.with_inverse(
+            (
+                1, xy, xz, 0,
+                yx, 1, yz, 0,
+                zx, zy, 1, 0,
+                0, 0, 0, 1
+            ),
+            (
+                i00, i01, i02, 0,
+                i10, i11, i12, 0,
+                i20, i21, i22, 0,
+                0, 0, 0, 1
+            )
+        )
+
+    def __matmul__(self, other: Matrix) -> Matrix4:
+        if other.size != 4:
+            raise ValueError("Does not support multiplying different sized matrices.")
+        if self.is_affine and other.is_affine:
+            return Matrix4(*_affine_product(self.data, other.data))
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self.data
+        b00, b01, b02, b03, b10, b11, b12, b13, b20, b21, b22, b23, b30, b31, b32, b33 = other.data
+        return Matrix4(
+            a00 * b00 + a01 * b10 + a02 * b20 + a03 * b30,
+            a00 * b01 + a01 * b11 + a02 * b21 + a03 * b31,
+            a00 * b02 + a01 * b12 + a02 * b22 + a03 * b32,
+            a00 * b03 + a01 * b13 + a02 * b23 + a03 * b33,
+            a10 * b00 + a11 * b10 + a12 * b20 + a13 * b30,
+            a10 * b01 + a11 * b11 + a12 * b21 + a13 * b31,
+            a10 * b02 + a11 * b12 + a12 * b22 + a13 * b32,
+            a10 * b03 + a11 * b13 + a12 * b23 + a13 * b33,
+            a20 * b00 + a21 * b10 + a22 * b20 + a23 * b30,
+            a20 * b01 + a21 * b11 + a22 * b21 + a23 * b31,
+            a20 * b02 + a21 * b12 + a22 * b22 + a23 * b32,
+            a20 * b03 + a21 * b13 + a22 * b23 + a23 * b33,
+            a30 * b00 + a31 * b10 + a32 * b20 + a33 * b30,
+            a30 * b01 + a31 * b11 + a32 * b21 + a33 * b31,
+            a30 * b02 + a31 * b12 + a32 * b22 + a33 * b32,
+            a30 * b03 + a31 * b13 + a32 * b23 + a33 * b33,
+        )
+
+    def __mul__(self, _tuple: Vector) -> Vector:
+        x, y, z, w = _tuple
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self.data
+        return Vector(
+            a00 * x + a01 * y + a02 * z + a03 * w,
+            a10 * x + a11 * y + a12 * z + a13 * w,
+            a20 * x + a21 * y + a22 * z + a23 * w,
+            a30 * x + a31 * y + a32 * z + a33 * w,
+        )
+
+    def transform_point(self, point: Vector) -> Vector:
+        x, y, z = point.x, point.y, point.z
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self.data
+        return Vector(
+            a00 * x + a01 * y + a02 * z + a03,
+            a10 * x + a11 * y + a12 * z + a13,
+            a20 * x + a21 * y + a22 * z + a23,
+            a30 * x + a31 * y + a32 * z + a33,
+        )
+
+    def transform_vector(self, vector: Vector) -> Vector:
+        x, y, z = vector.x, vector.y, vector.z
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self.data
+        return Vector(
+            a00 * x + a01 * y + a02 * z,
+            a10 * x + a11 * y + a12 * z,
+            a20 * x + a21 * y + a22 * z,
+            a30 * x + a31 * y + a32 * z,
+        )
+
+    def transpose(self) -> Matrix4:
+        if self._transpose is None:
+            a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self.data
+            transpose = Matrix4(
+                a00, a10, a20, a30,
+                a01, a11, a21, a31,
+                a02, a12, a22, a32,
+                a03, a13, a23, a33,
+            )
+            transpose._remember("_transpose", self)
+            self._remember("_transpose", transpose)
+        return self._transpose
+
+
+def _pair_inverses(transform: Matrix, inverse: Matrix):
+    transform._remember("_inverse", inverse)
+    inverse._remember("_inverse", transform)
+
+
+def _affine_product(a, b):
+    # Both operands have a bottom row of 0, 0, 0, 1, so it is skipped entirely.
+    a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23 = a[:12]
+    b00, b01, b02, b03, b10, b11, b12, b13, b20, b21, b22, b23 = b[:12]
+    return (
+        a00 * b00 + a01 * b10 + a02 * b20,
+        a00 * b01 + a01 * b11 + a02 * b21,
+        a00 * b02 + a01 * b12 + a02 * b22,
+        a00 * b03 + a01 * b13 + a02 * b23 + a03,
+        a10 * b00 + a11 * b10 + a12 * b20,
+        a10 * b01 + a11 * b11 + a12 * b21,
+        a10 * b02 + a11 * b12 + a12 * b22,
+        a10 * b03 + a11 * b13 + a12 * b23 + a13,
+        a20 * b00 + a21 * b10 + a22 * b20,
+        a20 * b01 + a21 * b11 + a22 * b21,
+        a20 * b02 + a21 * b12 + a22 * b22,
+        a20 * b03 + a21 * b13 + a22 * b23 + a23,
+        0, 0, 0, 1,
+    )
+
+
+def _determinant_3x3(a, b, c, d, e, f, g, h, i):
+    return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+
+def _inverse_3x3(a, b, c, d, e, f, g, h, i):
+    c00 = e * i - f * h
+    c01 = f * g - d * i
+    c02 = d * h - e * g
+    inverse_determinant = 1 / (a * c00 + b * c01 + c * c02)
+    return (
+        c00 * inverse_determinant,
+        (c * h - b * i) * inverse_determinant,
+        (b * f - c * e) * inverse_determinant,
+        c01 * inverse_determinant,
+        (a * i - c * g) * inverse_determinant,
+        (c * d - a * f) * inverse_determinant,
+        c02 * inverse_determinant,
+        (b * g - a * h) * inverse_determinant,
+        (a * e - b * d) * inverse_determinant,
+    )
+
+
+def _determinant_4x4(a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33):
+    s0 = a00 * a11 - a10 * a01
+    s1 = a00 * a12 - a10 * a02
+    s2 = a00 * a13 - a10 * a03
+    s3 = a01 * a12 - a11 * a02
+    s4 = a01 * a13 - a11 * a03
+    s5 = a02 * a13 - a12 * a03
+    c0 = a20 * a31 - a30 * a21
+    c1 = a20 * a32 - a30 * a22
+    c2 = a20 * a33 - a30 * a23
+    c3 = a21 * a32 - a31 * a22
+    c4 = a21 * a33 - a31 * a23
+    c5 = a22 * a33 - a32 * a23
+    return s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+
+
+def _inverse_4x4(a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33):
+    # 2x2 sub-determinants of the top and bottom row pairs (Laplace expansion).
+    s0 = a00 * a11 - a10 * a01
+    s1 = a00 * a12 - a10 * a02
+    s2 = a00 * a13 - a10 * a03
+    s3 = a01 * a12 - a11 * a02
+    s4 = a01 * a13 - a11 * a03
+    s5 = a02 * a13 - a12 * a03
+    c0 = a20 * a31 - a30 * a21
+    c1 = a20 * a32 - a30 * a22
+    c2 = a20 * a33 - a30 * a23
+    c3 = a21 * a32 - a31 * a22
+    c4 = a21 * a33 - a31 * a23
+    c5 = a22 * a33 - a32 * a23
+    inverse_determinant = 1 / (s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0)
+    return (
+        (a11 * c5 - a12 * c4 + a13 * c3) * inverse_determinant,
+        (-a01 * c5 + a02 * c4 - a03 * c3) * inverse_determinant,
+        (a31 * s5 - a32 * s4 + a33 * s3) * inverse_determinant,
+        (-a21 * s5 + a22 * s4 - a23 * s3) * inverse_determinant,
+        (-a10 * c5 + a12 * c2 - a13 * c1) * inverse_determinant,
+        (a00 * c5 - a02 * c2 + a03 * c1) * inverse_determinant,
+        (-a30 * s5 + a32 * s2 - a33 * s1) * inverse_determinant,
+        (a20 * s5 - a22 * s2 + a23 * s1) * inverse_determinant,
+        (a10 * c4 - a11 * c2 + a13 * c0) * inverse_determinant,
+        (-a00 * c4 + a01 * c2 - a03 * c0) * inverse_determinant,
+        (a30 * s4 - a31 * s2 + a33 * s0) * inverse_determinant,
+        (-a20 * s4 + a21 * s2 - a23 * s0) * inverse_determinant,
+        (-a10 * c3 + a11 * c1 - a12 * c0) * inverse_determinant,
+        (a00 * c3 - a01 * c1 + a02 * c0) * inverse_determinant,
+        (-a30 * s3 + a31 * s1 - a32 * s0) * inverse_determinant,
+        (a20 * s3 - a21 * s1 + a22 * s0) * inverse_determinant,
+    )
+
+
+Matrix.identity = Matrix4(
     1, 0, 0, 0,
     0, 1, 0, 0,
     0, 0, 1, 0,
     0, 0, 0, 1
 )
+_pair_inverses(Matrix.identity, Matrix.identity)
+
+
+class Transformable:
+    """
+    Mixin for anything with a ``transform`` attribute.
+
+    The inverse of the transform (world to object space) and the transpose
+    of that inverse (for normals) are computed on first use and kept until
+    ``transform`` is assigned again, so the hot paths never invert a matrix
+    themselves and a singular transform only fails when it is used.
+    """
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == "transform":
+            self.__dict__.pop("inverse_transform", None)
+            self.__dict__.pop("normal_transform", None)
+
+    def __getstate__(self):
+        # The cached inverses are rebuilt on demand, and leaving them out keeps
+        # the pickle (and so CompiledScene.digest) the same before and after use.
+        state = self.__dict__.copy()
+        state.pop("inverse_transform", None)
+        state.pop("normal_transform", None)
+        return state
+
+    @cached_property
+    def inverse_transform(self) -> Matrix:
+        return self.transform.inverse()
+
+    @cached_property
+    def normal_transform(self) -> Matrix:
+        return self.inverse_transform.transpose()
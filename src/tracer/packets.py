@@ -0,0 +1,242 @@
+"""
+Vectorised ray packets.
+
+A RayPacket holds many rays as NumPy arrays of origins and directions, and a
+PacketEngine intersects and shades a whole packet at once against a World of
+Spheres and Planes. The results match World.color_at ray for ray.
+
+NumPy is an optional dependency (``pip install tracer[packets]``), so this
+module is not imported by ``tracer`` itself.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .hulls import Plane, Sphere
+from .lighting import Ray
+from .shared import EPSILON
+from .tuples import Color, Vector
+
+__all__ = [
+    "PacketEngine",
+    "RayPacket",
+]
+
+
+def _dot(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    return np.einsum("ij,ij->i", left, right)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.sqrt(_dot(vectors, vectors))[:, np.newaxis]
+
+
+def _affine(matrix) -> tuple[np.ndarray, np.ndarray]:
+    values = np.array(matrix.data, dtype=float).reshape(4, 4)
+    return values[:3, :3], values[:3, 3]
+
+
+class RayPacket:
+    """A batch of rays stored as (N, 3) arrays of origins and directions."""
+
+    def __init__(self, origins: np.ndarray, directions: np.ndarray):
+        # reshape keeps an empty batch (N, 3) rather than (0,).
+        self.origins = np.asarray(origins, dtype=float).reshape(-1, 3)
+        self.directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.origins)
+
+    @classmethod
+    def from_rays(cls, rays: Sequence[Ray]) -> RayPacket:
+        return cls(
+            [ray.origin[:3] for ray in rays],
+            [ray.direction[:3] for ray in rays]
+        )
+
+    @classmethod
+    def for_pixels(cls, camera, xs: Iterable[int], ys: Iterable[int]) -> RayPacket:
+        """The camera rays through pixels (xs[i], ys[i]); the vector form of Camera.ray_for_pixel."""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        linear, offset = _affine(camera.inverse_transform)
+        world = np.stack(
+            (
+                camera.half_width - (xs + 0.5) * camera.pixel_size,
+                camera.half_height - (ys + 0.5) * camera.pixel_size,
+                np.full(len(xs), -1.0)
+            ),
+            axis=1
+        )
+        pixels = world @ linear.T + offset
+        origins = np.broadcast_to(offset, pixels.shape)
+        return cls(origins, _normalize(pixels - origins))
+
+    def position(self, distances: np.ndarray) -> np.ndarray:
+        return self.origins + self.directions * distances[:, np.newaxis]
+
+    def rays(self) -> list[Ray]:
+        return [
+            Ray(Vector.point(*origin), Vector.vector(*direction))
+            for origin, direction in zip(self.origins.tolist(), self.directions.tolist())
+        ]
+
+
+class PacketEngine:
+    """
+    Intersects and shades ray packets against a World.
+
+    Hull transforms, sphere origins and material parameters are gathered into
+    arrays once, when the engine is built; build a new engine after changing
+    the world. Patterned materials are evaluated per hit point in Python, as
+    patterns are arbitrary Python objects.
+    """
+
+    def __init__(self, world):
+        if not self.supports(world):
+            raise ValueError("PacketEngine only supports lit worlds of Spheres and Planes with affine transforms.")
+        self.world = world
+        self.hulls = list(world.children)
+        self._inverses = [_affine(hull.inverse_transform) for hull in self.hulls]
+        self._normals = [_affine(hull.normal_transform)[0] for hull in self.hulls]
+        self._origins = [
+            np.array(hull.origin[:3], dtype=float) if isinstance(hull, Sphere) else None
+            for hull in self.hulls
+        ]
+        materials = [hull.material for hull in self.hulls]
+        self._colors = np.array([material.color for material in materials], dtype=float).reshape(-1, 3)
+        self._ambient = np.array([material.ambient for material in materials], dtype=float)
+        self._diffuse = np.array([material.diffuse for material in materials], dtype=float)
+        self._specular = np.array([material.specular for material in materials], dtype=float)
+        self._shininess = np.array([material.shininess for material in materials], dtype=float)
+        self._light_position = np.array(world.light.position[:3], dtype=float)
+        self._light_intensity = np.array(world.light.intensity, dtype=float)
+
+    @staticmethod
+    def supports(world) -> bool:
+        return world.light is not None and all(
+            type(hull) in (Sphere, Plane) and hull.transform.is_affine
+            for hull in world.children
+        )
+
+    def intersect(
+            self, origins: np.ndarray, directions: np.ndarray, limits: np.ndarray = None, minimum: float = 0
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest hit beyond minimum for every ray.
+
+        Returns the hit distances and the index of the hull hit, with -1 (and
+        the limit, infinity by default) for rays that hit nothing closer.
+        """
+        count = len(origins)
+        best = np.full(count, np.inf) if limits is None else np.array(limits, dtype=float)
+        hit_index = np.full(count, -1)
+        for index, hull in enumerate(self.hulls):
+            linear, offset = self._inverses[index]
+            local_origins = origins @ linear.T + offset
+            local_directions = directions @ linear.T
+            if self._origins[index] is not None:
+                distances = self._sphere_distances(local_origins - self._origins[index], local_directions, minimum)
+            else:
+                distances = self._plane_distances(local_origins, local_directions, minimum)
+            closer = distances < best
+            best = np.where(closer, distances, best)
+            hit_index[closer] = index
+        return best, hit_index
+
+    @staticmethod
+    def _sphere_distances(sphere_to_ray: np.ndarray, directions: np.ndarray, minimum: float) -> np.ndarray:
+        a = _dot(directions, directions)
+        b = 2 * _dot(directions, sphere_to_ray)
+        c = _dot(sphere_to_ray, sphere_to_ray) - 1
+        discriminant = b * b - 4 * a * c
+        missed = discriminant < 0
+        root = np.sqrt(np.where(missed, 0, discriminant))
+        near = (-b - root) / (2 * a)
+        far = (-b + root) / (2 * a)
+        distances = np.where(near > minimum, near, far)
+        return np.where(missed | (distances <= minimum), np.inf, distances)
+
+    @staticmethod
+    def _plane_distances(origins: np.ndarray, directions: np.ndarray, minimum: float) -> np.ndarray:
+        parallel = np.abs(directions[:, 1]) < EPSILON
+        distances = -origins[:, 1] / np.where(parallel, 1, directions[:, 1])
+        return np.where(parallel | (distances <= minimum), np.inf, distances)
+
+    def _surface_normals(self, points: np.ndarray, hit_index: np.ndarray) -> np.ndarray:
+        normals = np.empty_like(points)
+        for index in np.unique(hit_index):
+            mask = hit_index == index
+            if self._origins[index] is not None:
+                linear, offset = self._inverses[index]
+                local_normals = points[mask] @ linear.T + offset - self._origins[index]
+            else:
+                local_normals = np.tile((0.0, 1.0, 0.0), (np.count_nonzero(mask), 1))
+            normals[mask] = _normalize(local_normals @ self._normals[index].T)
+        return normals
+
+    def _surface_colors(self, points: np.ndarray, hit_index: np.ndarray) -> np.ndarray:
+        colors = self._colors[hit_index]
+        for index in np.unique(hit_index):
+            hull = self.hulls[index]
+            pattern = hull.material.pattern
+            if pattern is None:
+                continue
+            mask = np.flatnonzero(hit_index == index)
+            colors[mask] = [
+                pattern.color_at_hull(hull, Vector.point(*point))
+                for point in points[mask].tolist()
+            ]
+        return colors
+
+    def color_at(self, packet: RayPacket) -> np.ndarray:
+        """Shade every ray in the packet, returning an (N, 3) array of colour channels."""
+        result = np.zeros((len(packet), 3))
+        distances, hit_index = self.intersect(packet.origins, packet.directions)
+        hit = hit_index >= 0
+        if not hit.any():
+            return result
+        hit_index = hit_index[hit]
+        directions = packet.directions[hit]
+        points = packet.origins[hit] + directions * distances[hit][:, np.newaxis]
+
+        eye_vectors = -directions
+        normals = self._surface_normals(points, hit_index)
+        inside = _dot(normals, eye_vectors) < 0
+        normals[inside] = -normals[inside]
+        over_points = points + normals * EPSILON
+
+        to_light = self._light_position - over_points
+        light_distances = np.sqrt(_dot(to_light, to_light))
+        _, blocker = self.intersect(
+            over_points, to_light / light_distances[:, np.newaxis], light_distances, minimum=EPSILON
+        )
+        shadowed = blocker >= 0
+
+        effective_colors = self._surface_colors(points, hit_index) * self._light_intensity
+        light_vectors = _normalize(self._light_position - points)
+        colors = effective_colors * self._ambient[hit_index][:, np.newaxis]
+
+        light_dot_normal = _dot(light_vectors, normals)
+        lit = (light_dot_normal >= 0) & ~shadowed
+        diffuse = effective_colors * (self._diffuse[hit_index] * light_dot_normal)[:, np.newaxis]
+        colors[lit] += diffuse[lit]
+
+        reflections = normals * (2 * light_dot_normal)[:, np.newaxis] - light_vectors
+        reflect_dot_eye = _dot(reflections, eye_vectors)
+        shines = lit & (reflect_dot_eye >= 0)
+        factors = np.power(np.where(shines, reflect_dot_eye, 0), self._shininess[hit_index])
+        specular = self._specular[hit_index] * factors
+        colors[shines] += self._light_intensity * specular[shines][:, np.newaxis]
+
+        result[hit] = colors
+        return result
+
+    def colors_at(self, packet: RayPacket) -> list[Color]:
+        return [Color(*channels) for channels in self.color_at(packet).tolist()]
+
+    def color_at_many(self, rays: Iterable[Ray]) -> list[Color]:
+        """Drop-in vectorised replacement for World.color_at_many."""
+        return self.colors_at(RayPacket.from_rays(list(rays)))
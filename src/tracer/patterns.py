@@ -1,24 +1,24 @@
 from dataclasses import dataclass
 from math import floor, sqrt
 
-from tracer.matrices import Matrix
+from tracer.matrices import Matrix, Transformable
 from tracer.tuples import Color, Vector, WHITE, BLACK
 from tracer.lighting import Hull
 
 
 @dataclass
-class AbstractPattern:
+class AbstractPattern(Transformable):
     transform: Matrix = Matrix.identity
 
     def color_at(self, point: Vector) -> Color:
         raise NotImplementedError
 
     def color_at_hull(self, hull: Hull, point: Vector) -> Color:
-        local_point = hull.transform.inverse() * point
+        local_point = hull.inverse_transform.transform_point(point)
         return self.color_internal(local_point)
 
     def color_internal(self, point: Vector):
-        pattern_local_point = self.transform.inverse() * point
+        pattern_local_point = self.inverse_transform.transform_point(point)
         return self.color_at(pattern_local_point)
 
 
@@ -1,17 +1,173 @@
 from __future__ import annotations
 
+import mmap
+import os
+from array import array
 from pathlib import Path
-from typing import Union
+from struct import Struct
+from typing import Optional, Sequence, Union
 
+from .images import writer_for
 from .tuples import Color
 
 
+STORAGES = ("list", "array", "mmap")
+
+# Mapped canvas files: magic, format version, width, height, typecode, then
+# the packed r, g, b values row by row in native byte order.
+_MAPPED_HEADER = Struct("<8sIIIc3x")
+_MAPPED_MAGIC = b"TRCANVAS"
+_MAPPED_VERSION = 1
+
+
+class ArrayPixels:
+    """The pixels of an array backed Canvas as a sequence of Colors, read and written through to the array."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: array):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values) // 3
+
+    def __iter__(self):
+        values = self.values
+        for index in range(0, len(values), 3):
+            yield Color(values[index], values[index + 1], values[index + 2])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Color, list[Color]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pixel index out of range")
+        values = self.values
+        return Color(values[3 * index], values[3 * index + 1], values[3 * index + 2])
+
+    def __setitem__(self, index: int, color: Color):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pixel index out of range")
+        values = self.values
+        values[3 * index], values[3 * index + 1], values[3 * index + 2] = color
+
+
 class Canvas:
+    """
+    A width by height grid of colours.
 
-    def __init__(self, width: int, height: int, default: Color = Color(0, 0, 0)):
-        self.pixels: list[Color] = [default for _ in range(width * height)]
+    The default "list" storage keeps one Color per pixel. "array" storage
+    keeps packed r, g, b values in a single array of typecode "d" (doubles)
+    or "f" (float32), about 24 or 12 bytes a pixel; it exposes them through
+    buffer() (and the buffer protocol on Python 3.12+), and pixels becomes a
+    view over the array. Both support the same per pixel, row and tile APIs.
+
+    "mmap" storage lays the same packed values out in a file at path, behind
+    a small header, and maps it into memory, so frames larger than RAM page
+    in and out as they are touched. Other processes, such as render
+    workers, can open() the same file and write into it, and a mapped
+    canvas can be reopened later to resume or post-process. Close it (or
+    use it as a context manager) when done.
+    """
+
+    def __init__(
+            self, width: int, height: int, default: Color = Color(0, 0, 0),
+            storage: str = "list", typecode: str = "d", path: Union[Path, str, None] = None
+    ):
+        if storage not in STORAGES:
+            raise ValueError(f"Unknown storage {storage!r}; expected one of {', '.join(STORAGES)}.")
         self.width: int = width
         self.height: int = height
+        self.storage = storage
+        self.typecode = typecode
+        self.path: Optional[Path] = None
+        if storage == "mmap":
+            if path is None:
+                raise ValueError("mmap storage needs a path.")
+            with open(path, "wb") as file:
+                file.write(_MAPPED_HEADER.pack(_MAPPED_MAGIC, _MAPPED_VERSION, width, height, typecode.encode("ascii")))
+                file.truncate(_MAPPED_HEADER.size + width * height * 3 * array(typecode).itemsize)
+            self._map(path)
+            if any(default):
+                fill = array(typecode, default[:3]) * width
+                for y in range(height):
+                    self.set_row(y, fill)
+        elif storage == "array":
+            self.values: Union[array, memoryview, None] = array(typecode, default[:3]) * (width * height)
+            self.pixels: Union[list[Color], ArrayPixels] = ArrayPixels(self.values)
+        else:
+            self.values = None
+            self.pixels = [default for _ in range(width * height)]
+
+    @classmethod
+    def open(cls, path: Union[Path, str]) -> Canvas:
+        """Reopen a canvas created with mmap storage; its pixels are read and written in place."""
+        with open(path, "rb") as file:
+            header = file.read(_MAPPED_HEADER.size)
+        if len(header) < _MAPPED_HEADER.size:
+            raise ValueError(f"{str(path)!r} is not a mapped canvas.")
+        magic, version, width, height, typecode = _MAPPED_HEADER.unpack(header)
+        if magic != _MAPPED_MAGIC or version != _MAPPED_VERSION or typecode not in (b"d", b"f"):
+            raise ValueError(f"{str(path)!r} is not a mapped canvas.")
+        expected = _MAPPED_HEADER.size + width * height * 3 * array(typecode.decode("ascii")).itemsize
+        actual = os.path.getsize(path)
+        if actual != expected:
+            raise ValueError(
+                f"{str(path)!r} holds {actual} bytes but its {width}x{height} header needs {expected}; "
+                f"it is truncated or damaged."
+            )
+        canvas = cls.__new__(cls)
+        canvas.width = width
+        canvas.height = height
+        canvas.storage = "mmap"
+        canvas.typecode = typecode.decode("ascii")
+        canvas._map(path)
+        return canvas
+
+    def _map(self, path: Union[Path, str]):
+        self.path = Path(path)
+        self._file = open(path, "r+b")
+        self._mapping = mmap.mmap(self._file.fileno(), 0)
+        self._view_mapping()
+
+    def _view_mapping(self):
+        self._view = memoryview(self._mapping)
+        size = self.width * self.height * 3 * array(self.typecode).itemsize
+        self.values = self._view[_MAPPED_HEADER.size:_MAPPED_HEADER.size + size].cast(self.typecode)
+        self.pixels = ArrayPixels(self.values)
+
+    def __enter__(self) -> Canvas:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def flush(self):
+        """Write a mapped canvas's changes through to its file."""
+        if self.storage == "mmap":
+            self._mapping.flush()
+
+    def close(self):
+        """
+        Unmap a mapped canvas; it cannot be used afterwards. Other storages need no closing.
+
+        Views from buffer() must be released first; while one is held, close()
+        raises BufferError and leaves the canvas open and usable.
+        """
+        if self.storage != "mmap" or self._mapping.closed:
+            return
+        self._mapping.flush()
+        self.values.release()
+        self._view.release()
+        try:
+            self._mapping.close()
+        except BufferError:
+            self._view_mapping()
+            raise BufferError("Release every view from buffer() before closing the canvas.") from None
+        self._file.close()
 
     def __iter__(self):
         yield from self.pixels
@@ -22,29 +178,68 @@ class Canvas:
     def __setitem__(self, key: tuple[int, int], value: Color):
         self.pixels[self._coordinate_to_index(*key)] = value
 
-    def save(self, file_path: Union[Path, str]):
-        with open(file_path, "w") as ppm:
-            lines = ["P3\n", f"{self.width} {self.height}\n", "255\n"]
-            for offset in range(0, ((self.height - 1) * self.width) + 1, self.width):
-                line_pixels = []
-                line_pixels_total_characters = 0
-                for pixel in self.pixels[offset:offset + self.width]:
-                    for element in pixel:
-                        element = min(max(round(element * 255), 0), 255)
-                        element_string = str(element)
-                        element_length = len(element_string)
-                        if line_pixels_total_characters + element_length + len(line_pixels) > 70:
-                            line = " ".join(line_pixels)
-                            line += "\n"
-                            lines.append(line)
-                            line_pixels = []
-                            line_pixels_total_characters = 0
-                        line_pixels.append(element_string)
-                        line_pixels_total_characters += element_length
-                line = " ".join(line_pixels)
-                line += "\n"
-                lines.append(line)
-            ppm.writelines(lines)
+    def buffer(self) -> memoryview:
+        """The packed r, g, b values of an array or mmap backed canvas, row by row, without copying."""
+        if self.values is None:
+            raise ValueError("Only array and mmap storage expose a buffer.")
+        return memoryview(self.values)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self.buffer()
+
+    def tile(self, x: int, y: int, width: int, height: int) -> array:
+        """A width by height block with its top left at x, y as packed r, g, b values, row by row."""
+        if self.values is not None:
+            block = array(self.typecode)
+            values = memoryview(self.values)
+            for row in range(y, y + height):
+                start = 3 * self._coordinate_to_index(x, row)
+                block.frombytes(values[start:start + 3 * width].cast("B"))
+            return block
+        block = array("d")
+        for row in range(y, y + height):
+            start = self._coordinate_to_index(x, row)
+            for pixel in self.pixels[start:start + width]:
+                block.extend(pixel)
+        return block
+
+    def blit(self, x: int, y: int, width: int, height: int, values: Sequence[float]):
+        """Write a width by height block of packed r, g, b values, row by row, with its top left at x, y."""
+        if self.values is not None:
+            typecode = self.typecode
+            length = 3 * width
+            for position, row in enumerate(range(y, y + height)):
+                start = 3 * self._coordinate_to_index(x, row)
+                self.values[start:start + length] = array(typecode, values[position * length:(position + 1) * length])
+            return
+        position = 0
+        for row in range(y, y + height):
+            start = self._coordinate_to_index(x, row)
+            for index in range(start, start + width):
+                self.pixels[index] = Color(values[position], values[position + 1], values[position + 2])
+                position += 3
+
+    def row(self, y: int) -> array:
+        return self.tile(0, y, self.width, 1)
+
+    def set_row(self, y: int, values: Sequence[float]):
+        self.blit(0, y, self.width, 1, values)
+
+    def save(self, file_path: Union[Path, str], format: Optional[str] = None):
+        """
+        Write the canvas to an image file.
+
+        The format is "p3" (ASCII PPM), "p6" (binary PPM), "pfm" (float, not
+        clamped) or "png", given by format or else by the file extension;
+        .ppm files and unrecognised extensions are P3. See tracer.images.
+        """
+        writer_type = writer_for(file_path, format)
+        with open(file_path, "wb") as stream:
+            writer = writer_type(stream, self.width, self.height)
+            rows = range(self.height)
+            for y in reversed(rows) if writer.bottom_up else rows:
+                writer.write_row(self.row(y))
+            writer.close()
 
     def _coordinate_to_index(self, x, y):
         return x + (y * self.width)
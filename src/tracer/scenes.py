@@ -0,0 +1,649 @@
+"""
+Flattened, read-only scenes for the hot rendering loops.
+
+World stays the authoring API; World.compile() walks its children and
+materials once and packs everything the tracer reads per ray into flat
+arrays indexed by hull id (the hull's position in World.children). Folded
+spheres and planes are intersected straight from those arrays; any other
+hull keeps its own object space test, fed from the stored inverse transform.
+Bounded hulls are reached through the same BVH World uses, flattened into
+node arrays; unbounded ones are tested for every ray.
+"""
+from __future__ import annotations
+
+import pickle
+from array import array
+from hashlib import sha256
+from math import inf, sqrt
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, Mapping, NamedTuple, Optional, Sequence
+
+from .bvh import BVH, BoundingBox, _Node
+from .hulls import FoldedPlane, FoldedSphere
+from .lighting import Hull, Light, Ray
+from .shared import EPSILON, number
+from .tuples import Color, Vector
+
+__all__ = [
+    "CompiledScene",
+    "SharedScene",
+]
+
+SPHERE = 0
+PLANE = 1
+GENERAL = 2
+
+
+class _Bounded(NamedTuple):
+    """A hull id standing in for its hull while the BVH is built."""
+    hull_id: int
+    box: BoundingBox
+
+    def bounds(self) -> BoundingBox:
+        return self.box
+
+
+def _flatten(node: _Node, bounds: array, offsets: array, counts: array, hull_ids: array) -> int:
+    """Append the subtree depth first to the node columns; returns the node's index."""
+    index = len(counts)
+    bounds.extend(node.box)
+    if node.hulls:
+        offsets.append(len(hull_ids))
+        counts.append(len(node.hulls))
+        hull_ids.extend(item.hull_id for item in node.hulls)
+        return index
+    offsets.append(0)
+    counts.append(0)
+    _flatten(node.left, bounds, offsets, counts, hull_ids)
+    offsets[index] = _flatten(node.right, bounds, offsets, counts, hull_ids)
+    return index
+
+
+class CompiledScene:
+    """
+    A struct-of-arrays snapshot of a World.
+
+    Sphere centres (three values per sphere) and radii, plane normals and
+    offsets, the inverse transform of every hull (sixteen values each) and
+    every material parameter are kept in array("d") columns. kinds and slots
+    map a hull id to its category (SPHERE, PLANE or GENERAL) and its position
+    within that category's columns.
+
+    Hulls with bounds are held in a BVH stored depth first: node_bounds has
+    six values per node, and a node with a node_counts entry of zero is
+    interior, its left child following it and its right child at
+    node_offsets; otherwise it is a leaf whose hull ids are node_counts
+    entries of node_hull_ids from node_offsets. unbounded_ids lists the
+    hulls without bounds.
+
+    The snapshot does not follow later changes to the world; compile again
+    instead. Attributes cannot be reassigned, and the arrays are shared by
+    every query, so they must not be modified in place.
+    """
+
+    __slots__ = (
+        "hulls",
+        "kinds",
+        "slots",
+        "sphere_ids",
+        "sphere_centers",
+        "sphere_radii",
+        "plane_ids",
+        "plane_normals",
+        "plane_offsets",
+        "general_ids",
+        "inverse_transforms",
+        "node_bounds",
+        "node_offsets",
+        "node_counts",
+        "node_hull_ids",
+        "unbounded_ids",
+        "colors",
+        "ambient",
+        "diffuse",
+        "specular",
+        "shininess",
+        "patterns",
+        "light_position",
+        "light_intensity",
+    )
+
+    def __init__(self, hulls: Sequence[Hull], light: Optional[Light] = None):
+        self._remember("hulls", tuple(hulls))
+        kinds = array("b")
+        slots = array("L")
+        sphere_ids = array("L")
+        sphere_centers = array("d")
+        sphere_radii = array("d")
+        plane_ids = array("L")
+        plane_normals = array("d")
+        plane_offsets = array("d")
+        general_ids = array("L")
+        inverse_transforms = array("d")
+        colors = array("d")
+        ambient = array("d")
+        diffuse = array("d")
+        specular = array("d")
+        shininess = array("d")
+        patterns = []
+        bounded = []
+        unbounded_ids = array("L")
+        for hull_id, hull in enumerate(self.hulls):
+            folded = getattr(hull, "folded", None)
+            if isinstance(folded, FoldedSphere):
+                kinds.append(SPHERE)
+                slots.append(len(sphere_ids))
+                sphere_ids.append(hull_id)
+                sphere_centers.extend(folded.center[:3])
+                sphere_radii.append(folded.radius)
+            elif isinstance(folded, FoldedPlane):
+                kinds.append(PLANE)
+                slots.append(len(plane_ids))
+                plane_ids.append(hull_id)
+                plane_normals.extend(folded.normal[:3])
+                plane_offsets.append(folded.offset)
+            else:
+                kinds.append(GENERAL)
+                slots.append(len(general_ids))
+                general_ids.append(hull_id)
+            inverse_transforms.extend(hull.inverse_transform.data)
+            box = hull.bounds()
+            if box is None:
+                unbounded_ids.append(hull_id)
+            else:
+                bounded.append(_Bounded(hull_id, box))
+            material = hull.material
+            colors.extend(material.color)
+            ambient.append(material.ambient)
+            diffuse.append(material.diffuse)
+            specular.append(material.specular)
+            shininess.append(material.shininess)
+            patterns.append(material.pattern)
+        self._remember("kinds", kinds)
+        self._remember("slots", slots)
+        self._remember("sphere_ids", sphere_ids)
+        self._remember("sphere_centers", sphere_centers)
+        self._remember("sphere_radii", sphere_radii)
+        self._remember("plane_ids", plane_ids)
+        self._remember("plane_normals", plane_normals)
+        self._remember("plane_offsets", plane_offsets)
+        self._remember("general_ids", general_ids)
+        self._remember("inverse_transforms", inverse_transforms)
+        node_bounds = array("d")
+        node_offsets = array("L")
+        node_counts = array("L")
+        node_hull_ids = array("L")
+        root = BVH(bounded).root
+        if root is not None:
+            _flatten(root, node_bounds, node_offsets, node_counts, node_hull_ids)
+        self._remember("node_bounds", node_bounds)
+        self._remember("node_offsets", node_offsets)
+        self._remember("node_counts", node_counts)
+        self._remember("node_hull_ids", node_hull_ids)
+        self._remember("unbounded_ids", unbounded_ids)
+        self._remember("colors", colors)
+        self._remember("ambient", ambient)
+        self._remember("diffuse", diffuse)
+        self._remember("specular", specular)
+        self._remember("shininess", shininess)
+        self._remember("patterns", tuple(patterns))
+        self._remember("light_position", None if light is None else tuple(light.position[:3]))
+        self._remember("light_intensity", None if light is None else tuple(light.intensity))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only.")
+
+    def _remember(self, name, value):
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            self._remember(name, value)
+
+    def __len__(self):
+        return len(self.hulls)
+
+    @property
+    def light(self) -> Optional[Light]:
+        if self.light_position is None:
+            return None
+        return Light(Vector.point(*self.light_position), Color(*self.light_intensity))
+
+    def traced_hulls(self) -> tuple[Optional[Hull], ...]:
+        """The hulls still consulted while tracing (general hulls and patterned ones), None for the rest."""
+        return tuple(
+            hull if self.kinds[hull_id] == GENERAL or self.patterns[hull_id] is not None else None
+            for hull_id, hull in enumerate(self.hulls)
+        )
+
+    def digest(self) -> str:
+        """A hash of everything that affects how the scene traces; equal scenes render identically."""
+        digest = sha256()
+        for name in _columns:
+            digest.update(getattr(self, name).tobytes())
+        digest.update(pickle.dumps(
+            (
+                tuple(f"{type(hull).__module__}.{type(hull).__qualname__}" for hull in self.hulls),
+                self.traced_hulls(),
+                self.patterns,
+                self.light_position,
+                self.light_intensity,
+            ),
+            pickle.HIGHEST_PROTOCOL
+        ))
+        return digest.hexdigest()
+
+    def updated(self, hulls: Mapping[int, Hull] = None, light: Optional[Light] = None) -> CompiledScene:
+        """
+        A new scene with the given hull ids replaced and, if given, a new light.
+
+        Lets a copy of the scene be kept current from small deltas rather
+        than a fresh World.compile(); adding or removing hulls needs a compile.
+        """
+        children = list(self.hulls)
+        for hull_id, hull in (hulls or {}).items():
+            if not 0 <= hull_id < len(children):
+                raise IndexError(f"No hull with id {hull_id}.")
+            children[hull_id] = hull
+        return CompiledScene(children, self.light if light is None else light)
+
+    def _general_distances(self, hull_id: int, ox, oy, oz, dx, dy, dz) -> tuple[number, ...]:
+        base = hull_id * 16
+        a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p = self.inverse_transforms[base:base + 16]
+        local_origin = Vector(
+            a * ox + b * oy + c * oz + d,
+            e * ox + f * oy + g * oz + h,
+            i * ox + j * oy + k * oz + l,
+            m * ox + n * oy + o * oz + p
+        )
+        local_direction = Vector(
+            a * dx + b * dy + c * dz,
+            e * dx + f * dy + g * dz,
+            i * dx + j * dy + k * dz,
+            m * dx + n * dy + o * dz
+        )
+        return self.hulls[hull_id]._distances(Ray(local_origin, local_direction))
+
+    def _hit(self, hull_id: int, ox, oy, oz, dx, dy, dz, low: number, high: number) -> Optional[number]:
+        """The nearest distance in (low, high) at which the ray hits the hull, or None."""
+        kind = self.kinds[hull_id]
+        if kind == SPHERE:
+            slot = self.slots[hull_id]
+            centers = self.sphere_centers
+            sx = ox - centers[3 * slot]
+            sy = oy - centers[3 * slot + 1]
+            sz = oz - centers[3 * slot + 2]
+            radius = self.sphere_radii[slot]
+            a = dx * dx + dy * dy + dz * dz
+            b = 2 * (dx * sx + dy * sy + dz * sz)
+            c = sx * sx + sy * sy + sz * sz - radius * radius
+            discriminant = b * b - 4 * a * c
+            if discriminant < 0:
+                return None
+            root = sqrt(discriminant)
+            near = (-b - root) / (2 * a)
+            if low < near < high:
+                return near
+            far = (-b + root) / (2 * a)
+            if low < far < high:
+                return far
+            return None
+        if kind == PLANE:
+            slot = self.slots[hull_id]
+            normals = self.plane_normals
+            nx = normals[3 * slot]
+            ny = normals[3 * slot + 1]
+            nz = normals[3 * slot + 2]
+            denominator = nx * dx + ny * dy + nz * dz
+            if abs(denominator) < EPSILON:
+                return None
+            distance = (self.plane_offsets[slot] - (nx * ox + ny * oy + nz * oz)) / denominator
+            if low < distance < high:
+                return distance
+            return None
+        nearest = None
+        for distance in self._general_distances(hull_id, ox, oy, oz, dx, dy, dz):
+            if low < distance < high:
+                nearest = high = distance
+        return nearest
+
+    def _entry(self, node: int, ox, oy, oz, ix, iy, iz, t_max: number) -> Optional[number]:
+        """Distance at which the ray enters the node's box, or None if it misses it before t_max; see BoundingBox.entry."""
+        base = 6 * node
+        bounds = self.node_bounds
+        near = -inf
+        far = t_max
+        for low, high, start, inverse in (
+                (bounds[base], bounds[base + 3], ox, ix),
+                (bounds[base + 1], bounds[base + 4], oy, iy),
+                (bounds[base + 2], bounds[base + 5], oz, iz),
+        ):
+            if inverse == inf:
+                if start < low or start > high:
+                    return None
+                continue
+            t_low = (low - start) * inverse
+            t_high = (high - start) * inverse
+            if t_low > t_high:
+                t_low, t_high = t_high, t_low
+            if t_low > near:
+                near = t_low
+            if t_high < far:
+                far = t_high
+            if near > far:
+                return None
+        if far < 0:
+            return None
+        return near
+
+    def _closest(self, ox, oy, oz, dx, dy, dz, t_max: number) -> tuple[int, number]:
+        nearest = -1
+        best = t_max
+        for hull_id in self.unbounded_ids:
+            distance = self._hit(hull_id, ox, oy, oz, dx, dy, dz, 0, best)
+            if distance is not None:
+                nearest = hull_id
+                best = distance
+        if not self.node_counts:
+            return nearest, best
+        ix = 1 / dx if dx else inf
+        iy = 1 / dy if dy else inf
+        iz = 1 / dz if dz else inf
+        offsets = self.node_offsets
+        counts = self.node_counts
+        hull_ids = self.node_hull_ids
+        entry = self._entry(0, ox, oy, oz, ix, iy, iz, best)
+        stack = [] if entry is None else [(entry, 0)]
+        while stack:
+            entry, node = stack.pop()
+            if entry >= best:
+                continue
+            count = counts[node]
+            if count:
+                offset = offsets[node]
+                for hull_id in hull_ids[offset:offset + count]:
+                    distance = self._hit(hull_id, ox, oy, oz, dx, dy, dz, 0, best)
+                    if distance is not None:
+                        nearest = hull_id
+                        best = distance
+                continue
+            left = node + 1
+            right = offsets[node]
+            left_entry = self._entry(left, ox, oy, oz, ix, iy, iz, best)
+            right_entry = self._entry(right, ox, oy, oz, ix, iy, iz, best)
+            # Visit the nearer child first, so the farther one is often skipped.
+            if left_entry is None:
+                if right_entry is not None:
+                    stack.append((right_entry, right))
+            elif right_entry is None:
+                stack.append((left_entry, left))
+            elif left_entry <= right_entry:
+                stack.append((right_entry, right))
+                stack.append((left_entry, left))
+            else:
+                stack.append((left_entry, left))
+                stack.append((right_entry, right))
+        return nearest, best
+
+    def _occluded(self, ox, oy, oz, dx, dy, dz, t_max: number) -> bool:
+        for hull_id in self.unbounded_ids:
+            if self._hit(hull_id, ox, oy, oz, dx, dy, dz, EPSILON, t_max) is not None:
+                return True
+        if not self.node_counts:
+            return False
+        ix = 1 / dx if dx else inf
+        iy = 1 / dy if dy else inf
+        iz = 1 / dz if dz else inf
+        offsets = self.node_offsets
+        counts = self.node_counts
+        hull_ids = self.node_hull_ids
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._entry(node, ox, oy, oz, ix, iy, iz, t_max) is None:
+                continue
+            count = counts[node]
+            if count:
+                offset = offsets[node]
+                for hull_id in hull_ids[offset:offset + count]:
+                    if self._hit(hull_id, ox, oy, oz, dx, dy, dz, EPSILON, t_max) is not None:
+                        return True
+                continue
+            stack.append(offsets[node])
+            stack.append(node + 1)
+        return False
+
+    def closest_hit(self, ray: Ray, t_max: number = inf) -> tuple[int, number]:
+        """The id and distance of the nearest hull hit in (0, t_max), or (-1, t_max) on a miss."""
+        ox, oy, oz, _ = ray.origin
+        dx, dy, dz, _ = ray.direction
+        return self._closest(ox, oy, oz, dx, dy, dz, t_max)
+
+    def is_occluded(self, ray: Ray, t_max: number) -> bool:
+        """Any-hit query: whether anything lies along the ray in (EPSILON, t_max)."""
+        ox, oy, oz, _ = ray.origin
+        dx, dy, dz, _ = ray.direction
+        return self._occluded(ox, oy, oz, dx, dy, dz, t_max)
+
+    def _normal(self, hull_id: int, px, py, pz) -> tuple[number, number, number]:
+        kind = self.kinds[hull_id]
+        base = 3 * self.slots[hull_id]
+        if kind == SPHERE:
+            centers = self.sphere_centers
+            nx = px - centers[base]
+            ny = py - centers[base + 1]
+            nz = pz - centers[base + 2]
+            magnitude = sqrt(nx * nx + ny * ny + nz * nz)
+            return nx / magnitude, ny / magnitude, nz / magnitude
+        if kind == PLANE:
+            normals = self.plane_normals
+            return normals[base], normals[base + 1], normals[base + 2]
+        x, y, z, _ = self.hulls[hull_id].normal_at(Vector.point(px, py, pz))
+        return x, y, z
+
+    def normal_at(self, hull_id: int, point: Vector) -> Vector:
+        return Vector.vector(*self._normal(hull_id, point.x, point.y, point.z))
+
+    def _color(self, ox, oy, oz, dx, dy, dz) -> tuple[number, number, number]:
+        hull_id, distance = self._closest(ox, oy, oz, dx, dy, dz, inf)
+        if hull_id < 0:
+            return 0, 0, 0
+        px = ox + dx * distance
+        py = oy + dy * distance
+        pz = oz + dz * distance
+        nx, ny, nz = self._normal(hull_id, px, py, pz)
+        if nx * -dx + ny * -dy + nz * -dz < 0:
+            nx, ny, nz = -nx, -ny, -nz
+
+        lx, ly, lz = self.light_position
+        ir, ig, ib = self.light_intensity
+        over_x = px + nx * EPSILON
+        over_y = py + ny * EPSILON
+        over_z = pz + nz * EPSILON
+        tx = lx - over_x
+        ty = ly - over_y
+        tz = lz - over_z
+        light_distance = sqrt(tx * tx + ty * ty + tz * tz)
+        shadowed = self._occluded(
+            over_x, over_y, over_z,
+            tx / light_distance, ty / light_distance, tz / light_distance,
+            light_distance
+        )
+
+        pattern = self.patterns[hull_id]
+        if pattern is not None:
+            red, green, blue = pattern.color_at_hull(self.hulls[hull_id], Vector.point(px, py, pz))
+        else:
+            base = 3 * hull_id
+            red, green, blue = self.colors[base:base + 3]
+        red *= ir
+        green *= ig
+        blue *= ib
+
+        ambient = self.ambient[hull_id]
+        r = red * ambient
+        g = green * ambient
+        b = blue * ambient
+
+        vx = lx - px
+        vy = ly - py
+        vz = lz - pz
+        magnitude = sqrt(vx * vx + vy * vy + vz * vz)
+        vx /= magnitude
+        vy /= magnitude
+        vz /= magnitude
+        light_dot_normal = vx * nx + vy * ny + vz * nz
+        if light_dot_normal < 0 or shadowed:
+            return r, g, b
+
+        diffuse = self.diffuse[hull_id] * light_dot_normal
+        r += red * diffuse
+        g += green * diffuse
+        b += blue * diffuse
+
+        specular = self.specular[hull_id]
+        if not specular:
+            return r, g, b
+        reflect_dot_eye = -(
+            (2 * light_dot_normal * nx - vx) * dx
+            + (2 * light_dot_normal * ny - vy) * dy
+            + (2 * light_dot_normal * nz - vz) * dz
+        )
+        if reflect_dot_eye < 0:
+            return r, g, b
+        factor = specular * reflect_dot_eye ** self.shininess[hull_id]
+        return r + ir * factor, g + ig * factor, b + ib * factor
+
+    def color_at(self, ray: Ray) -> Color:
+        """The same colour as World.color_at for the world this scene was compiled from."""
+        if self.light_position is None:
+            raise ValueError("Cannot shade a scene without a light.")
+        ox, oy, oz, _ = ray.origin
+        dx, dy, dz, _ = ray.direction
+        return Color(*self._color(ox, oy, oz, dx, dy, dz))
+
+    def color_at_many(self, rays: Iterable[Ray]) -> list[Color]:
+        return [self.color_at(ray) for ray in rays]
+
+
+_columns = (
+    "kinds",
+    "slots",
+    "sphere_ids",
+    "sphere_centers",
+    "sphere_radii",
+    "plane_ids",
+    "plane_normals",
+    "plane_offsets",
+    "general_ids",
+    "inverse_transforms",
+    "node_bounds",
+    "node_offsets",
+    "node_counts",
+    "node_hull_ids",
+    "unbounded_ids",
+    "colors",
+    "ambient",
+    "diffuse",
+    "specular",
+    "shininess",
+)
+
+_HEADER = 8
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class SharedScene:
+    """
+    A CompiledScene published once in a multiprocessing.shared_memory block.
+
+    Other processes attach() by name and read the columns in place, so handing
+    a scene to a worker costs the same however many hulls it holds. Only the
+    hulls that still run Python code when traced (general hulls and those
+    with patterns) are pickled into the block; attached scenes hold None for
+    the rest, and are meant for tracing, not for updated().
+
+    The creating process owns the block: close and unlink it once every worker
+    is done, or use the SharedScene as a context manager, which does both.
+    """
+
+    def __init__(self, scene: CompiledScene):
+        self.scene = scene
+        self._views = []
+        self._owner = True
+        hulls = scene.traced_hulls()
+        layout = {}
+        offset = 0
+        for name in _columns:
+            column = getattr(scene, name)
+            layout[name] = (column.typecode, offset, len(column))
+            offset += _aligned(len(column) * column.itemsize)
+        manifest = pickle.dumps(
+            (layout, hulls, scene.patterns, scene.light_position, scene.light_intensity),
+            pickle.HIGHEST_PROTOCOL
+        )
+        start = _aligned(_HEADER + len(manifest))
+        self.memory = SharedMemory(create=True, size=start + offset)
+        buffer = self.memory.buf
+        buffer[:_HEADER] = start.to_bytes(_HEADER, "little")
+        buffer[_HEADER:_HEADER + len(manifest)] = manifest
+        for name, (_, column_offset, _) in layout.items():
+            data = getattr(scene, name).tobytes()
+            buffer[start + column_offset:start + column_offset + len(data)] = data
+
+    @classmethod
+    def attach(cls, name: str) -> SharedScene:
+        """Open a block published by another process; its scene reads the shared columns without copying."""
+        shared = cls.__new__(cls)
+        shared._owner = False
+        shared.memory = SharedMemory(name)
+        buffer = shared.memory.buf
+        start = int.from_bytes(buffer[:_HEADER], "little")
+        layout, hulls, patterns, light_position, light_intensity = pickle.loads(buffer[_HEADER:start])
+        state = {
+            "hulls": hulls,
+            "patterns": patterns,
+            "light_position": light_position,
+            "light_intensity": light_intensity,
+        }
+        shared._views = []
+        for name, (typecode, offset, length) in layout.items():
+            raw = buffer[start + offset:start + offset + length * array(typecode).itemsize]
+            column = raw.cast(typecode)
+            shared._views.extend((column, raw))
+            state[name] = column
+        scene = CompiledScene.__new__(CompiledScene)
+        scene.__setstate__(state)
+        shared.scene = scene
+        return shared
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def __enter__(self) -> SharedScene:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def close(self):
+        """Detach from the block; an attached scene is unusable afterwards."""
+        for view in self._views:
+            view.release()
+        self._views = []
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
@@ -0,0 +1,115 @@
+"""
+Streaming destinations for rendered tiles.
+
+A sink takes tiles through the same blit(x, y, width, height, values) call
+as a Canvas, so any execution back end can render into one (see
+Camera.render_to). Row sinks hold on to tiles only until every row they
+touch is complete, then hand rows on in file order, so memory is bounded by
+the rows in flight rather than the whole frame.
+"""
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+from .images import writer_for
+
+__all__ = [
+    "FileSink",
+    "RowSink",
+]
+
+
+class RowSink:
+    """
+    Collects tiles, in any order, and emits complete rows in file order.
+
+    Rows go to write_row(y, values), top to bottom, or bottom to top when
+    bottom_up is set. Pass write_row or override it. Each pixel must be
+    blitted exactly once.
+    """
+
+    def __init__(
+            self, width: int, height: int,
+            write_row: Optional[Callable[[int, array], None]] = None, bottom_up: bool = False
+    ):
+        self.width = width
+        self.height = height
+        self.bottom_up = bottom_up
+        if write_row is not None:
+            self.write_row = write_row
+        self._rows: dict[int, array] = {}
+        self._filled: dict[int, int] = {}
+        self._next = height - 1 if bottom_up else 0
+        self.rows_written = 0
+
+    @property
+    def pending(self) -> int:
+        """Rows started but not yet written."""
+        return len(self._rows)
+
+    def write_row(self, y: int, values: array):
+        raise NotImplementedError
+
+    def blit(self, x: int, y: int, width: int, height: int, values: Sequence[float]):
+        length = 3 * width
+        for position, row in enumerate(range(y, y + height)):
+            buffer = self._rows.get(row)
+            if buffer is None:
+                buffer = self._rows[row] = array("d", bytes(8 * 3 * self.width))
+                self._filled[row] = 0
+            buffer[3 * x:3 * x + length] = array("d", values[position * length:(position + 1) * length])
+            self._filled[row] += width
+        self._emit()
+
+    def _emit(self):
+        step = -1 if self.bottom_up else 1
+        while self._filled.get(self._next) == self.width:
+            row = self._next
+            del self._filled[row]
+            self.write_row(row, self._rows.pop(row))
+            self.rows_written += 1
+            self._next += step
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Only {self.rows_written} of {self.height} rows were completed.")
+
+
+class FileSink(RowSink):
+    """
+    Streams rows into an image file as they complete; see Canvas.save for formats.
+
+    The file is flushed after every row, so a long render can be watched as
+    it fills in. Use it as a context manager, or close() it once rendered.
+    """
+
+    def __init__(self, file_path: Union[Path, str], width: int, height: int, format: Optional[str] = None):
+        writer_type = writer_for(file_path, format)
+        super().__init__(width, height, bottom_up=writer_type.bottom_up)
+        self.stream = open(file_path, "wb")
+        self.writer = writer_type(self.stream, width, height)
+
+    def __enter__(self) -> FileSink:
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the original error; the partial file is neither finished nor checked.
+            self.stream.close()
+
+    def write_row(self, y: int, values: array):
+        self.writer.write_row(values)
+        self.stream.flush()
+
+    def close(self):
+        if self.stream.closed:
+            return
+        try:
+            self.writer.close()
+        finally:
+            self.stream.close()
+        super().close()
@@ -0,0 +1,148 @@
+"""
+Tile scheduling for Camera.render.
+
+The image is cut into rectangular tiles that workers pull one at a time, so
+expensive regions of a scene spread across workers instead of landing in one
+fixed slab. Each worker receives the camera and the compiled scene once, in
+its pool initializer, and answers every tile with a single packed array("d")
+of RGB values in row-major order, which is blitted into the Canvas. The
+scene reaches workers as a tracer.scenes.SharedScene, which they attach to
+by name rather than unpickling.
+"""
+from __future__ import annotations
+
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple, Optional, Sequence
+
+from .renderer import Canvas
+from .scenes import SharedScene
+
+__all__ = [
+    "SharedFramebuffer",
+    "Tile",
+    "render_tile",
+    "split",
+]
+
+
+class Tile(NamedTuple):
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def size(self) -> int:
+        return self.width * self.height
+
+    def coordinates(self):
+        """Pixel coordinates in row-major order, the order of a tile buffer."""
+        for y in range(self.y, self.y + self.height):
+            for x in range(self.x, self.x + self.width):
+                yield x, y
+
+
+def split(width: int, height: int, tile_size: int) -> list[Tile]:
+    """Tiles of at most tile_size by tile_size pixels covering a width by height image, row by row."""
+    if tile_size < 1:
+        raise ValueError("tile_size must be at least 1.")
+    return [
+        Tile(x, y, min(tile_size, width - x), min(tile_size, height - y))
+        for y in range(0, height, tile_size)
+        for x in range(0, width, tile_size)
+    ]
+
+
+def render_tile(camera, scene, tile: Tile) -> array:
+    """The colours of every pixel in the tile, packed as r, g, b, r, g, b, ..."""
+    buffer = array("d")
+    for x, y in tile.coordinates():
+        buffer.extend(scene.color_at(camera.ray_for_pixel(x, y)))
+    return buffer
+
+
+class SharedFramebuffer:
+    """
+    A width by height image of packed RGB doubles in a multiprocessing.shared_memory block.
+
+    Workers attach() by name and write each finished tile straight into it,
+    so only the tile coordinates travel back to the parent. As with
+    SharedScene, the creating process closes and unlinks the block, which
+    the context manager does.
+    """
+
+    def __init__(self, width: int, height: int, name: Optional[str] = None):
+        self.width = width
+        self.height = height
+        self._owner = name is None
+        if name is None:
+            self.memory = SharedMemory(create=True, size=max(width * height * 3, 1) * 8)
+        else:
+            self.memory = SharedMemory(name)
+        self.values = self.memory.buf[:width * height * 3 * 8].cast("d")
+
+    @classmethod
+    def attach(cls, name: str, width: int, height: int) -> SharedFramebuffer:
+        return cls(width, height, name)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def __enter__(self) -> SharedFramebuffer:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def write(self, tile: Tile, buffer: Sequence[float]):
+        """Copy a packed tile buffer, as made by render_tile, into place."""
+        row_length = tile.width * 3
+        for row in range(tile.height):
+            start = ((tile.y + row) * self.width + tile.x) * 3
+            self.values[start:start + row_length] = buffer[row * row_length:(row + 1) * row_length]
+
+    def read(self, tile: Tile) -> array:
+        """The tile's pixels as a packed buffer, the inverse of write."""
+        buffer = array("d")
+        row_length = tile.width * 3
+        for row in range(tile.y, tile.y + tile.height):
+            start = (row * self.width + tile.x) * 3
+            buffer.frombytes(self.values[start:start + row_length].cast("B"))
+        return buffer
+
+    def close(self):
+        self.values.release()
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
+
+
+_worker = {}
+
+
+def _initialize_worker(
+        camera, scene_name: str, framebuffer: Optional[tuple[str, int, int]] = None, canvas_path: Optional[str] = None
+):
+    shared = SharedScene.attach(scene_name)
+    _worker["camera"] = camera
+    _worker["shared"] = shared
+    _worker["scene"] = shared.scene
+    if framebuffer is not None:
+        _worker["write"] = SharedFramebuffer.attach(*framebuffer).write
+    elif canvas_path is not None:
+        canvas = Canvas.open(canvas_path)
+        _worker["write"] = lambda tile, buffer: canvas.blit(*tile, buffer)
+
+
+def _render_worker_tile(tile: Tile) -> tuple[Tile, array]:
+    return tile, render_tile(_worker["camera"], _worker["scene"], tile)
+
+
+def _write_worker_tile(tile: Tile) -> Tile:
+    _worker["write"](tile, render_tile(_worker["camera"], _worker["scene"], tile))
+    return tile
@@ -1,4 +1,6 @@
-from .matrices import Matrix, number
+from __future__ import annotations
+
+from .matrices import Matrix, Matrix4, number
 
 __all__ = [
     "translation",
@@ -6,29 +8,97 @@ __all__ = [
     "rotation_x",
     "rotation_y",
     "rotation_z",
-    "shearing"
+    "shearing",
+    "TransformBuilder"
 ]
 
 
 def translation(x: number, y: number, z: number) -> Matrix:
-    return Matrix.identity.translate(x, y, z)
+    return Matrix4.translation(x, y, z)
 
 
 def scaling(x: number, y: number, z: number) -> Matrix:
-    return Matrix.identity.scale(x, y, z)
+    return Matrix4.scaling(x, y, z)
 
 
 def rotation_x(radians: number) -> Matrix:
-    return Matrix.identity.rotate_x(radians)
+    return Matrix4.rotation_x(radians)
 
 
 def rotation_y(radians: number) -> Matrix:
-    return Matrix.identity.rotate_y(radians)
+    return Matrix4.rotation_y(radians)
 
 
 def rotation_z(radians: number) -> Matrix:
-    return Matrix.identity.rotate_z(radians)
+    return Matrix4.rotation_z(radians)
 
 
 def shearing(xy: number, xz: number, yx: number, yz: number, zx: number, zy: number):
-    return Matrix.identity.shear(xy, xz, yx, yz, zx, zy)
+    return Matrix4.shearing(xy, xz, yx, yz, zx, zy)
+
+
+_steps = {
+    "translate": translation,
+    "scale": scaling,
+    "rotate_x": rotation_x,
+    "rotate_y": rotation_y,
+    "rotate_z": rotation_z,
+    "shear": shearing,
+}
+
+
+class TransformBuilder:
+    """
+    Records a chain of translate, scale, rotate and shear steps.
+
+    Steps apply in the order they are recorded, like the fluent Matrix API.
+    build() fuses them into one affine Matrix4 and composes the exact inverse
+    of each step in reverse order, so the result never needs a general
+    inversion. Builders are immutable; every step returns a new builder, which
+    makes it cheap to keep a base chain and vary the tail per frame.
+    """
+
+    def __init__(self, steps: tuple[tuple[str, tuple[number, ...]], ...] = ()):
+        self.steps = steps
+
+    def __eq__(self, other):
+        if not isinstance(other, TransformBuilder):
+            return NotImplemented
+        return self.steps == other.steps
+
+    def __repr__(self):
+        return f"TransformBuilder({self.steps!r})"
+
+    def _then(self, name: str, *arguments: number) -> TransformBuilder:
+        return TransformBuilder(self.steps + ((name, arguments),))
+
+    def translate(self, x: number, y: number, z: number) -> TransformBuilder:
+        return self._then("translate", x, y, z)
+
+    def scale(self, x: number, y: number, z: number) -> TransformBuilder:
+        return self._then("scale", x, y, z)
+
+    def rotate_x(self, radians: number) -> TransformBuilder:
+        return self._then("rotate_x", radians)
+
+    def rotate_y(self, radians: number) -> TransformBuilder:
+        return self._then("rotate_y", radians)
+
+    def rotate_z(self, radians: number) -> TransformBuilder:
+        return self._then("rotate_z", radians)
+
+    def shear(self, xy: number, xz: number, yx: number, yz: number, zx: number, zy: number) -> TransformBuilder:
+        return self._then("shear", xy, xz, yx, yz, zx, zy)
+
+    def build(self) -> Matrix4:
+        transform = Matrix.identity
+        inverse = Matrix.identity
+        for name, arguments in self.steps:
+            step = _steps[name](*arguments)
+            transform = step @ transform
+            if inverse is not None:
+                # A flattening step leaves nothing to invert.
+                inverse = inverse @ step.inverse() if step.invertible else None
+        if inverse is None:
+            return transform
+        return Matrix4.with_inverse(transform.data, inverse.data)
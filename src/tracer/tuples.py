@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from functools import wraps, singledispatchmethod
 from math import isclose, sqrt
 from typing import Union, NamedTuple
 
@@ -19,38 +18,8 @@ __all__ = [
 ]
 
 
-def length_protection(function):
-
-    @wraps(function)
-    def wrapper(left, right):
-        if len(left) != len(right):
-            raise ValueError(f"May only {function.__name__} tuples of the same length.")
-        return function(left, right)
-    return wrapper
-
-
-@length_protection
-def add(self, other):
-    return type(self)(*(left + right for left, right in zip(self, other)))
-
-
-@length_protection
-def subtract(self, other):
-    return type(self)(*(left - right for left, right in zip(self, other)))
-
-
-@length_protection
-def compare_equality(self, other):
-    return all(isclose(left, right, abs_tol=EPSILON) for left, right in zip(self, other))
-
-
-def scalar_multiplication(self, scalar):
-    return type(self)(*(val * scalar for val in self))
-
-
-@length_protection
-def hadamard_product(self, other):
-    return type(self)(*(left * right for left, right in zip(self, other)))
+def _length_mismatch(operation: str, other) -> ValueError:
+    return ValueError(f"May only {operation} tuples of the same length, not {len(other)}.")
 
 
 class Vector(NamedTuple):
@@ -59,6 +28,9 @@ class Vector(NamedTuple):
     z: Union[float, int]
     w: Union[float, int]
 
+    # Arithmetic is written out per component: these methods run many times
+    # per pixel and a zip/generator based version costs several times more.
+
     def cross(self, other):
         if self.w != 0 or other.w != 0:
             raise NotImplementedError("Only 3 dimensional cross products supported.")
@@ -70,7 +42,9 @@ class Vector(NamedTuple):
         )
 
     def dot(self, other):
-        return sum(a * b for a, b in zip(self, other))
+        x, y, z, w = self
+        ox, oy, oz, ow = other
+        return x * ox + y * oy + z * oz + w * ow
 
     @property
     def is_point(self) -> bool:
@@ -82,14 +56,19 @@ class Vector(NamedTuple):
 
     @property
     def magnitude(self) -> Union[float, int]:
-        return sqrt(sum(x ** 2 for x in self))
+        x, y, z, w = self
+        return sqrt(x * x + y * y + z * z + w * w)
 
     def normalize(self) -> Vector:
-        magnitude = self.magnitude
-        return Vector(*(v / magnitude for v in self))
+        x, y, z, w = self
+        magnitude = sqrt(x * x + y * y + z * z + w * w)
+        return Vector(x / magnitude, y / magnitude, z / magnitude, w / magnitude)
 
     def reflect(self, normal) -> Vector:
-        return self - normal * 2 * self.dot(normal)
+        x, y, z, w = self
+        nx, ny, nz, nw = normal
+        factor = 2 * (x * nx + y * ny + z * nz + w * nw)
+        return Vector(x - nx * factor, y - ny * factor, z - nz * factor, w - nw * factor)
 
     @classmethod
     def point(cls, x, y, z) -> Vector:
@@ -100,22 +79,45 @@ class Vector(NamedTuple):
         return cls(x, y, z, 0)
 
     def __add__(self, other):
-        return add(self, other)
+        if len(other) != 4:
+            raise _length_mismatch("add", other)
+        x, y, z, w = self
+        ox, oy, oz, ow = other
+        return Vector(x + ox, y + oy, z + oz, w + ow)
 
     def __eq__(self, other):
-        return compare_equality(self, other)
+        if len(other) != 4:
+            raise _length_mismatch("compare", other)
+        x, y, z, w = self
+        ox, oy, oz, ow = other
+        return (
+            isclose(x, ox, abs_tol=EPSILON)
+            and isclose(y, oy, abs_tol=EPSILON)
+            and isclose(z, oz, abs_tol=EPSILON)
+            and isclose(w, ow, abs_tol=EPSILON)
+        )
+
+    def __ne__(self, other):
+        return not self == other
 
     def __mul__(self, scalar):
-        return scalar_multiplication(self, scalar)
+        x, y, z, w = self
+        return Vector(x * scalar, y * scalar, z * scalar, w * scalar)
 
     def __neg__(self):
-        return type(self)(*(-x for x in self))
+        x, y, z, w = self
+        return Vector(-x, -y, -z, -w)
 
     def __sub__(self, other) -> Vector:
-        return subtract(self, other)
+        if len(other) != 4:
+            raise _length_mismatch("subtract", other)
+        x, y, z, w = self
+        ox, oy, oz, ow = other
+        return Vector(x - ox, y - oy, z - oz, w - ow)
 
     def __truediv__(self, scalar):
-        return type(self)(*(val / scalar for val in self))
+        x, y, z, w = self
+        return Vector(x / scalar, y / scalar, z / scalar, w / scalar)
 
 
 class Color(NamedTuple):
@@ -124,22 +126,41 @@ class Color(NamedTuple):
     blue: Union[float, int]
 
     def __add__(self, other) -> Color:
-        return add(self, other)
+        if len(other) != 3:
+            raise _length_mismatch("add", other)
+        red, green, blue = self
+        other_red, other_green, other_blue = other
+        return Color(red + other_red, green + other_green, blue + other_blue)
+
+    def __eq__(self, other) -> bool:
+        if len(other) != 3:
+            raise _length_mismatch("compare", other)
+        red, green, blue = self
+        other_red, other_green, other_blue = other
+        return (
+            isclose(red, other_red, abs_tol=EPSILON)
+            and isclose(green, other_green, abs_tol=EPSILON)
+            and isclose(blue, other_blue, abs_tol=EPSILON)
+        )
 
-    def __eq__(self, other) -> Color:
-        return compare_equality(self, other)
+    def __ne__(self, other):
+        return not self == other
 
     def __sub__(self, other) -> Color:
-        return subtract(self, other)
+        if len(other) != 3:
+            raise _length_mismatch("subtract", other)
+        red, green, blue = self
+        other_red, other_green, other_blue = other
+        return Color(red - other_red, green - other_green, blue - other_blue)
 
-    @singledispatchmethod
     def __mul__(self, other) -> Color:
-        return hadamard_product(self, other)
-
-    @__mul__.register(int)
-    @__mul__.register(float)
-    def _(self, scalar) -> Color:
-        return scalar_multiplication(self, scalar)
+        red, green, blue = self
+        if isinstance(other, (int, float)):
+            return Color(red * other, green * other, blue * other)
+        if len(other) != 3:
+            raise _length_mismatch("multiply", other)
+        other_red, other_green, other_blue = other
+        return Color(red * other_red, green * other_green, blue * other_blue)
 
 
 ZERO_VECTOR = Vector(0, 0, 0, 0)
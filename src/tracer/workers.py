@@ -0,0 +1,206 @@
+"""
+A long lived pool of render workers, reused across frames.
+
+Each worker process has its own inbox queue. Scene and camera changes are
+broadcast to every inbox, tagged with an increasing version, while tiles go
+to a single shared task queue that idle workers pull from. A tile carries the
+version it must be rendered at, and a worker first applies everything in its
+inbox up to that version, so a frame never mixes old and new scene data.
+"""
+from __future__ import annotations
+
+import multiprocessing
+from array import array
+from queue import Empty
+from traceback import format_exc
+from typing import Mapping, Optional
+
+from .executors import _check_workers
+from .lighting import Hull, Light
+from .renderer import Canvas
+from .scenes import CompiledScene
+from .tiles import render_tile, split
+
+__all__ = [
+    "Renderer",
+]
+
+# How long render() waits for a tile before checking that every worker is alive.
+_POLL_SECONDS = 0.5
+
+
+def _apply(state: dict, kind: str, payload):
+    if kind == "scene":
+        state["scene"] = payload
+    elif kind == "camera":
+        state["camera"] = payload
+    elif kind == "delta":
+        hulls, light = payload
+        state["scene"] = state["scene"].updated(hulls, light)
+
+
+def _work(inbox, tasks, results):
+    state = {}
+    applied = 0
+    # Why the state is unusable, from a failed message until the next whole scene arrives.
+    broken = None
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        version, tile = task
+        while applied < version:
+            # Versions go up by one per message, so a message that fails still counts.
+            applied += 1
+            try:
+                kind, _, payload = inbox.get()
+                _apply(state, kind, payload)
+            except Exception:
+                broken = format_exc()
+            else:
+                if kind == "scene":
+                    broken = None
+        if broken is not None:
+            results.put((version, tile, broken))
+            continue
+        try:
+            results.put((version, tile, render_tile(state["camera"], state["scene"], tile)))
+        except Exception:
+            results.put((version, tile, format_exc()))
+
+
+class Renderer:
+    """
+    Renders frames on a warm pool of worker processes.
+
+    load() ships a compiled scene to every worker once; update() then sends
+    only the hulls and light that changed, and render() only the camera.
+    Close the renderer (or use it as a context manager) to stop the workers.
+    If a worker dies, render() raises RuntimeError and the renderer closes.
+
+        with Renderer(workers=4) as renderer:
+            renderer.load(world)
+            for frame in frames:
+                world.children[0].transform = frame.transform
+                renderer.update(hulls={0: world.children[0]})
+                canvas = renderer.render(camera)
+    """
+
+    def __init__(self, workers: Optional[int] = None, start_method: Optional[str] = None):
+        context = multiprocessing.get_context(start_method)
+        self.scene: Optional[CompiledScene] = None
+        self.version = 0
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._inboxes = []
+        self._processes = []
+        for _ in range(_check_workers(workers)):
+            inbox = context.Queue()
+            process = context.Process(target=_work, args=(inbox, self._tasks, self._results), daemon=True)
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+
+    @property
+    def workers(self) -> int:
+        return len(self._processes)
+
+    @property
+    def closed(self) -> bool:
+        return not self._processes
+
+    def __enter__(self) -> Renderer:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _broadcast(self, kind: str, payload):
+        if self.closed:
+            raise ValueError("Renderer is closed.")
+        self.version += 1
+        for inbox in self._inboxes:
+            inbox.put((kind, self.version, payload))
+
+    def load(self, world):
+        """Compile the world and send the whole scene to every worker."""
+        self.scene = world.compile()
+        self._broadcast("scene", self.scene)
+
+    def update(self, hulls: Mapping[int, Hull] = None, light: Optional[Light] = None):
+        """
+        Replace the hulls with the given ids (positions in World.children) and, if given, the light.
+
+        Only the changed hulls travel to the workers. Adding or removing hulls
+        needs a fresh load().
+        """
+        if self.scene is None:
+            raise ValueError("Nothing loaded to update; call load first.")
+        hulls = dict(hulls or {})
+        self.scene = self.scene.updated(hulls, light)
+        self._broadcast("delta", (hulls, light))
+
+    def render(self, camera, tile_size: int = 16, storage: str = "list") -> Canvas:
+        """Render the loaded scene through the camera, tiles going to whichever worker is free."""
+        if self.scene is None:
+            raise ValueError("Nothing loaded to render; call load first.")
+        self._broadcast("camera", camera)
+        canvas = Canvas(camera.horizontal_pixels, camera.vertical_pixels, storage=storage)
+        tiles = split(camera.horizontal_pixels, camera.vertical_pixels, tile_size)
+        for tile in tiles:
+            self._tasks.put((self.version, tile))
+        failure = None
+        remaining = len(tiles)
+        while remaining:
+            version, tile, buffer = self._next_result()
+            if version != self.version:
+                # Left over from an earlier, interrupted render.
+                continue
+            remaining -= 1
+            if isinstance(buffer, array):
+                canvas.blit(*tile, buffer)
+            elif failure is None:
+                failure = (tile, buffer)
+        if failure is not None:
+            tile, trace = failure
+            raise RuntimeError(f"Rendering {tile} failed in a worker:\n{trace}")
+        return canvas
+
+    def _next_result(self):
+        while True:
+            try:
+                return self._results.get(timeout=_POLL_SECONDS)
+            except Empty:
+                pass
+            dead = [process for process in self._processes if not process.is_alive()]
+            if dead:
+                self._terminate()
+                raise RuntimeError(
+                    f"A render worker exited unexpectedly (exit code {dead[0].exitcode}); the renderer is closed."
+                )
+
+    def _terminate(self):
+        """Stop every worker at once, dropping whatever is still queued."""
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join()
+        for queue in (self._tasks, self._results, *self._inboxes):
+            queue.cancel_join_thread()
+            queue.close()
+        self._processes = []
+        self._inboxes = []
+
+    def close(self):
+        """Stop the workers and wait for them to exit. Closing twice is harmless."""
+        if self.closed:
+            return
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join()
+        for queue in (self._tasks, self._results, *self._inboxes):
+            queue.close()
+            queue.join_thread()
+        self._processes = []
+        self._inboxes = []
@@ -1,10 +1,15 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
+from math import inf
+from operator import is_
+from typing import Iterable, Iterator, Optional
 
+from .bvh import BVH
 from .hulls import Sphere
 from .matrices import Matrix
-from .lighting import Light, Hull, Material, Intersections, Computations, Ray
-from .tuples import Vector, Color
+from .scenes import CompiledScene
+from .lighting import Light, HitBuffer, Hull, Material, Intersection, Intersections, Computations, Ray
+from .tuples import BLACK, Vector, Color
 
 
 @dataclass
@@ -12,6 +17,52 @@ class World:
     children: list[Hull] = field(default_factory=list)
     light: Light = None
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_hierarchy", None)
+        return state
+
+    def _acceleration(self) -> tuple[BVH, list[Hull]]:
+        """
+        The BVH over bounded children plus the list of unbounded ones.
+
+        Built on first use and rebuilt whenever children is reassigned or
+        changed in place, or one of its hulls' geometry changes. Spotting an
+        in place change walks children, so methods tracing several rays
+        fetch this once.
+        """
+        children = self.children
+        cached = self.__dict__.get("_hierarchy")
+        if (
+                cached is None
+                or cached[0] is not children
+                or len(cached[1]) != len(children)
+                or not all(map(is_, cached[1], children))
+        ):
+            boxes = [hull.bounds() for hull in children]
+            bounded = [hull for hull, box in zip(children, boxes) if box is not None]
+            unbounded = [hull for hull, box in zip(children, boxes) if box is None]
+            for hull in children:
+                watched_by = getattr(hull, "_watched_by", None)
+                if watched_by is not None:
+                    watched_by(self)
+            cached = (children, list(children), BVH(bounded), unbounded)
+            self.__dict__["_hierarchy"] = cached
+        return cached[2], cached[3]
+
+    def _geometry_changed(self):
+        """Called by a child whose geometry was reassigned; the BVH is rebuilt on next use."""
+        self.__dict__.pop("_hierarchy", None)
+
+    def compile(self) -> CompiledScene:
+        """A flattened, read-only snapshot of this world for rendering; see tracer.scenes."""
+        return CompiledScene(self.children, self.light)
+
+    def _candidates(self, ray: Ray, t_max: float, acceleration: tuple[BVH, list[Hull]]) -> Iterator[Hull]:
+        hierarchy, unbounded = acceleration
+        yield from unbounded
+        yield from hierarchy.candidates(ray, t_max)
+
     def __len__(self):
         return len(self.children)
 
@@ -19,12 +70,37 @@ class World:
         return item in self.children or item == self.light
 
     def color_at(self, ray: Ray) -> Color:
-        intersections = self.intersect(ray)
-        hit = intersections.hit()
+        acceleration = self._acceleration()
+        hit = self._closest_hit(ray, inf, acceleration)
         if not hit:
             return Color(0, 0, 0)
         computations = hit.prepare_computations(ray)
-        return self.shade_hit(computations)
+        return self._shade(computations, self._is_shadowed(computations.over_point, acceleration))
+
+    def color_at_many(self, rays: Iterable[Ray]) -> list[Color]:
+        """
+        Colours for a batch of rays, computed stage by stage.
+
+        Every ray is intersected, then every hit prepared, then every shadow
+        tested and finally every hit shaded, so each stage runs as one tight
+        loop. Anything with a matching color_at_many (such as
+        tracer.packets.PacketEngine) can stand in for the world.
+        """
+        rays = list(rays)
+        acceleration = self._acceleration()
+        hits = [self._closest_hit(ray, inf, acceleration) for ray in rays]
+        computations = [
+            hit.prepare_computations(ray) if hit is not None else None
+            for hit, ray in zip(hits, rays)
+        ]
+        shadows = [
+            self._is_shadowed(computation.over_point, acceleration) if computation is not None else False
+            for computation in computations
+        ]
+        return [
+            self._shade(computation, shadowed) if computation is not None else BLACK
+            for computation, shadowed in zip(computations, shadows)
+        ]
 
     @classmethod
     def default(cls) -> World:
@@ -44,8 +120,10 @@ class World:
         return World(children, light)
 
     def shade_hit(self, computations: Computations) -> Color:
+        return self._shade(computations, self.is_shadowed(computations.over_point))
+
+    def _shade(self, computations: Computations, shadowed: bool) -> Color:
         hull = computations.hull
-        shadowed = self.is_shadowed(computations.over_point)
         return hull.lighting(
             self.light,
             computations.point,
@@ -55,17 +133,55 @@ class World:
         )
 
     def intersect(self, ray) -> Intersections:
-        intersections = []
-        for hull in self.children:
-            intersections.extend(hull.intersects(ray))
-        return Intersections(sorted(intersections, key=lambda x: x.distance))
+        return self.record_hits(ray).intersections()
+
+    def record_hits(self, ray: Ray) -> HitBuffer:
+        """Every intersection along the ray as compact records."""
+        buffer = HitBuffer()
+        for hull in self._candidates(ray, inf, self._acceleration()):
+            hull.record_hits(ray, buffer)
+        return buffer
+
+    def closest_hit(self, ray: Ray, t_max: float = inf) -> Optional[Intersection]:
+        """
+        The nearest positive hit closer than t_max, without collecting or sorting every intersection.
+
+        Equivalent to intersect(ray).hit(); use intersect when all intersections are needed.
+        """
+        return self._closest_hit(ray, t_max, self._acceleration())
+
+    def _closest_hit(
+            self, ray: Ray, t_max: float, acceleration: tuple[BVH, list[Hull]]
+    ) -> Optional[Intersection]:
+        nearest = None
+        best = t_max
+        hierarchy, unbounded = acceleration
+        for hull in unbounded:
+            distance = hull.closest_distance(ray, best)
+            if distance is not None:
+                nearest = hull
+                best = distance
+        hull, best = hierarchy.closest(ray, best)
+        if hull is not None:
+            nearest = hull
+        if nearest is None:
+            return None
+        return Intersection(best, nearest)
+
+    def is_occluded(self, ray: Ray, t_max: float) -> bool:
+        """Any-hit query: whether anything lies along the ray in (EPSILON, t_max)."""
+        return self._is_occluded(ray, t_max, self._acceleration())
+
+    def _is_occluded(self, ray: Ray, t_max: float, acceleration: tuple[BVH, list[Hull]]) -> bool:
+        for hull in self._candidates(ray, t_max, acceleration):
+            if hull.occludes(ray, t_max):
+                return True
+        return False
 
     def is_shadowed(self, point) -> bool:
+        return self._is_shadowed(point, self._acceleration())
+
+    def _is_shadowed(self, point, acceleration: tuple[BVH, list[Hull]]) -> bool:
         to_light = self.light.position - point
         distance = to_light.magnitude
-        ray = Ray(point, to_light.normalize())
-        intersections = self.intersect(ray)
-        hit = intersections.hit()
-        if hit is not None and hit.distance < distance:
-            return True
-        return False
+        return self._is_occluded(Ray(point, to_light / distance), distance, acceleration)
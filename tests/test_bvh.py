@@ -0,0 +1,169 @@
+import pickle
+from math import inf, isclose, pi
+from random import Random
+
+from pytest import mark, raises
+
+from tracer import (
+    Color,
+    EPSILON,
+    Light,
+    Plane,
+    point,
+    Ray,
+    Sphere,
+    transforms,
+    vector,
+    World,
+)
+from tracer.bvh import BoundingBox, BVH
+
+
+def test_sphere_bounds():
+    assert Sphere().bounds() == BoundingBox(-1, -1, -1, 1, 1, 1)
+    sphere = Sphere(transform=transforms.translation(1, 2, 3).scale(2, 2, 2))
+    assert sphere.bounds() == BoundingBox(0, 2, 4, 4, 6, 8)
+
+
+def test_rotated_sphere_bounds_contain_sphere():
+    box = Sphere(transform=transforms.rotation_z(pi / 4)).bounds()
+    assert box.max_x >= 1 and box.min_x <= -1
+
+
+def test_plane_is_unbounded():
+    assert Plane().bounds() is None
+
+
+@mark.parametrize(
+    "ray, expected",
+    [
+        [Ray(point(5, 0.5, 0), vector(-1, 0, 0)), 4],
+        [Ray(point(0, 0, 0), vector(0, 0, 1)), -1],
+        [Ray(point(0, 5, 0), vector(0, 1, 0)), None],
+        [Ray(point(2, 0, 0), vector(0, 0, 1)), None],
+        [Ray(point(-2, -2, -2), vector(1, 1, 1)), 1],
+    ]
+)
+def test_bounding_box_entry(ray, expected):
+    box = BoundingBox(-1, -1, -1, 1, 1, 1)
+    inverse = tuple(1 / v if v else inf for v in ray.direction[:3])
+    assert box.entry(ray.origin, inverse) == expected
+
+
+def test_bounding_box_entry_beyond_limit():
+    box = BoundingBox(-1, -1, -1, 1, 1, 1)
+    assert box.entry(point(5, 0, 0), (-1, inf, inf), t_max=3) is None
+
+
+def test_bvh_requires_bounds():
+    with raises(ValueError):
+        BVH([Plane()])
+
+
+def random_spheres(count: int, seed: int = 7) -> list:
+    random = Random(seed)
+    return [
+        Sphere(
+            transform=transforms.translation(
+                random.uniform(-20, 20), random.uniform(-20, 20), random.uniform(-20, 20)
+            ).scale(*(random.uniform(0.2, 1.5),) * 3)
+        )
+        for _ in range(count)
+    ]
+
+
+def test_bvh_candidates_include_every_hit():
+    spheres = random_spheres(200)
+    hierarchy = BVH(spheres)
+    random = Random(3)
+    for _ in range(50):
+        ray = Ray(
+            point(random.uniform(-30, 30), random.uniform(-30, 30), -40),
+            vector(random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5), 1).normalize()
+        )
+        candidates = set(map(id, hierarchy.candidates(ray)))
+        assert len(candidates) < len(spheres)
+        for sphere in spheres:
+            if len(sphere.intersects(ray)):
+                assert id(sphere) in candidates
+
+
+def test_world_intersect_matches_brute_force():
+    world = World(random_spheres(100) + [Plane(transform=transforms.translation(0, -25, 0))])
+    ray = Ray(point(0, 0, -40), vector(0.1, -0.2, 1).normalize())
+    expected = sorted(
+        (i.distance for hull in world.children for i in hull.intersects(ray))
+    )
+    actual = [i.distance for i in world.intersect(ray)]
+    assert len(actual) == len(expected)
+    for distance, expected_distance in zip(actual, expected):
+        assert isclose(distance, expected_distance, abs_tol=EPSILON)
+
+
+def test_world_rebuilds_hierarchy_when_children_change():
+    world = World([Sphere()])
+    ray = Ray(point(5, 0, -5), vector(0, 0, 1))
+    assert len(world.intersect(ray)) == 0
+
+    world.children.append(Sphere(transform=transforms.translation(5, 0, 0)))
+    assert len(world.intersect(ray)) == 2
+
+    world.children[1].transform = transforms.translation(-5, 0, 0)
+    assert len(world.intersect(ray)) == 0
+
+    world.children = [Sphere(transform=transforms.translation(5, 0, 0))]
+    assert len(world.intersect(ray)) == 2
+
+
+def test_world_follows_the_callers_list():
+    children = []
+    world = World(children, Light(point(-10, 10, -10), Color(1, 1, 1)))
+    ray = Ray(point(0, 0, -5), vector(0, 0, 1))
+    assert world.color_at(ray) == Color(0, 0, 0)
+    children.append(Sphere())
+    assert world.children is children
+    assert world.color_at(ray) != Color(0, 0, 0)
+    children[0] = Sphere(transform=transforms.translation(5, 0, 0))
+    assert world.closest_hit(ray) is None
+
+
+def test_world_hierarchy_ignores_unrelated_hulls():
+    world = World([Sphere(), Sphere(transform=transforms.translation(5, 0, 0))])
+    ray = Ray(point(5, 0, -5), vector(0, 0, 1))
+    assert len(world.intersect(ray)) == 2
+    hierarchy = world._acceleration()[0]
+
+    Sphere(transform=transforms.translation(1, 2, 3)).transform = transforms.scaling(2, 2, 2)
+    World([Sphere()]).children[0].transform = transforms.translation(5, 0, 0)
+    assert world._acceleration()[0] is hierarchy
+
+    world.children[1].transform = transforms.translation(-5, 0, 0)
+    assert world._acceleration()[0] is not hierarchy
+    assert len(world.intersect(ray)) == 0
+
+
+def test_world_pickle_keeps_watching_hulls():
+    world = pickle.loads(pickle.dumps(World([Sphere()])))
+    ray = Ray(point(5, 0, -5), vector(0, 0, 1))
+    assert len(world.intersect(ray)) == 0
+    world.children[0].transform = transforms.translation(5, 0, 0)
+    assert len(world.intersect(ray)) == 2
+
+
+def test_bvh_closest_matches_brute_force():
+    spheres = random_spheres(200)
+    hierarchy = BVH(spheres)
+    random = Random(5)
+    for _ in range(50):
+        ray = Ray(
+            point(random.uniform(-30, 30), random.uniform(-30, 30), -40),
+            vector(random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5), 1).normalize()
+        )
+        hits = [(i.distance, i.hull) for sphere in spheres for i in sphere.intersects(ray) if i.distance > 0]
+        hull, distance = hierarchy.closest(ray)
+        if not hits:
+            assert hull is None
+        else:
+            expected_distance, expected_hull = min(hits, key=lambda hit: hit[0])
+            assert isclose(distance, expected_distance, abs_tol=EPSILON)
+            assert hull is expected_hull
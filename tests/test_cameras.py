@@ -1,8 +1,9 @@
 from math import pi, isclose, sqrt
+from random import Random
 
 from pytest import mark
 
-from tracer import Camera, Color, Matrix, Ray, point, vector, World
+from tracer import Camera, Color, CompiledScene, Light, Matrix, Ray, Sphere, point, transforms, vector, World
 
 
 def test_camera_constructor():
@@ -52,3 +53,44 @@ def test_camera_render_world():
     camera = Camera(11, 11, pi / 2, transform=Matrix.view(point(0, 0, -5), point(0, 0, 0), vector(0, 1, 0)))
     image = camera.render(world)
     assert image[5, 5] == Color(0.38066, 0.47583, 0.2855)
+
+
+def test_camera_render_in_tiles_matches_color_at():
+    world = World.default()
+    camera = Camera(13, 9, pi / 2, transform=Matrix.view(point(0, 0, -5), point(0, 0, 0), vector(0, 1, 0)))
+    image = camera.render(world, tile_size=4)
+    for y in range(camera.vertical_pixels):
+        for x in range(camera.horizontal_pixels):
+            assert image[x, y] == world.color_at(camera.ray_for_pixel(x, y))
+
+
+def test_camera_render_into_array_canvas():
+    world = World.default()
+    camera = Camera(11, 11, pi / 2, transform=Matrix.view(point(0, 0, -5), point(0, 0, 0), vector(0, 1, 0)))
+    image = camera.render(world, executor="serial", storage="array")
+    assert image.storage == "array"
+    assert image[5, 5] == Color(0.38066, 0.47583, 0.2855)
+
+
+def test_camera_render_uses_the_scene_hierarchy(monkeypatch):
+    random = Random(2)
+    world = World(
+        [
+            Sphere(transform=transforms.scaling(0.3, 0.3, 0.3).translate(
+                random.uniform(-10, 10), random.uniform(-10, 10), random.uniform(0, 20)
+            ))
+            for _ in range(1000)
+        ],
+        Light(point(-10, 10, -10), Color(1, 1, 1))
+    )
+    camera = Camera(8, 8, pi / 3, transform=Matrix.view(point(0, 0, -10), point(0, 0, 0), vector(0, 1, 0)))
+    tested = []
+    hit = CompiledScene._hit
+    monkeypatch.setattr(
+        CompiledScene, "_hit", lambda self, hull_id, *ray: tested.append(hull_id) or hit(self, hull_id, *ray)
+    )
+    image = camera.render(world, executor="serial")
+    # A linear scan would test every sphere for each camera ray and each shadow ray.
+    assert len(tested) < 64 * 1000 / 10
+    for x, y in [(0, 0), (3, 4), (7, 7)]:
+        assert image[x, y] == world.color_at(camera.ray_for_pixel(x, y))
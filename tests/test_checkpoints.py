@@ -0,0 +1,104 @@
+from math import pi
+
+from pytest import fixture, raises
+
+from tracer import Camera, Matrix, point, Sphere, transforms, vector, World
+from tracer.checkpoints import Checkpoint, checkpoint_key
+from tracer.executors import SerialExecutor
+from tracer.tiles import Tile
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FlakyExecutor(SerialExecutor):
+    """Renders the first few tiles, then fails like a preempted job."""
+
+    def __init__(self, tiles_before_failure=None):
+        self.tiles_before_failure = tiles_before_failure
+        self.rendered = []
+
+    def map(self, camera, scene, tiles):
+        for tile, buffer in super().map(camera, scene, tiles):
+            if len(self.rendered) == self.tiles_before_failure:
+                raise Interrupted
+            self.rendered.append(tile)
+            yield tile, buffer
+
+
+@fixture
+def camera() -> Camera:
+    return Camera(11, 9, pi / 2, transform=Matrix.view(point(0, 0, -5), point(0, 0, 0), vector(0, 1, 0)))
+
+
+def test_checkpoint_key(camera):
+    scene = World.default().compile()
+    key = checkpoint_key(camera, scene, 4)
+    assert key == checkpoint_key(camera, World.default().compile(), 4)
+    assert key != checkpoint_key(camera, scene, 8)
+    moved = Camera(11, 9, pi / 2, transform=Matrix.view(point(0, 1, -5), point(0, 0, 0), vector(0, 1, 0)))
+    assert key != checkpoint_key(moved, scene, 4)
+    world = World.default()
+    world.children.append(Sphere(transform=transforms.translation(2, 0, 0)))
+    assert key != checkpoint_key(camera, world.compile(), 4)
+
+
+def test_resume_skips_finished_tiles(camera, tmp_path):
+    world = World.default()
+    path = tmp_path / "frame.checkpoint"
+    flaky = FlakyExecutor(tiles_before_failure=5)
+    with raises(Interrupted):
+        camera.render(world, tile_size=4, executor=flaky, checkpoint=path)
+    assert path.exists()
+
+    resumed = FlakyExecutor()
+    image = camera.render(world, tile_size=4, executor=resumed, checkpoint=path)
+    assert len(resumed.rendered) == 9 - 5
+    assert not set(resumed.rendered) & set(flaky.rendered)
+    assert list(image) == list(camera.render(world, executor="serial"))
+    assert not path.exists()
+    assert not (tmp_path / "frame.checkpoint.tiles").exists()
+
+
+def test_changed_scene_starts_again(camera, tmp_path):
+    path = tmp_path / "frame.checkpoint"
+    with raises(Interrupted):
+        camera.render(World.default(), tile_size=4, executor=FlakyExecutor(3), checkpoint=path)
+    world = World.default()
+    world.children[1].transform = transforms.scaling(0.4, 0.4, 0.4)
+    fresh = FlakyExecutor()
+    image = camera.render(world, tile_size=4, executor=fresh, checkpoint=path)
+    assert len(fresh.rendered) == 9
+    assert list(image) == list(camera.render(world, executor="serial"))
+
+
+def test_checkpoint_ignores_torn_journal_lines(tmp_path):
+    path = tmp_path / "frame.checkpoint"
+    with Checkpoint(path, "key", 4, 4) as checkpoint:
+        checkpoint.blit(0, 0, 2, 2, [0.5] * 12)
+    with open(f"{path}.tiles", "a") as journal:
+        journal.write("2 0 2")
+    with Checkpoint(path, "key", 4, 4) as checkpoint:
+        assert checkpoint.completed == {Tile(0, 0, 2, 2)}
+        assert checkpoint.remaining([Tile(0, 0, 2, 2), Tile(2, 0, 2, 2)]) == [Tile(2, 0, 2, 2)]
+        assert checkpoint.canvas[1, 1][0] == 0.5
+    with open(f"{path}.tiles") as journal:
+        assert journal.read().endswith("0 0 2 2\n")
+
+
+def test_checkpoint_with_damaged_frame_starts_again(tmp_path):
+    path = tmp_path / "frame.checkpoint"
+    with Checkpoint(path, "key", 4, 4) as checkpoint:
+        checkpoint.blit(0, 0, 2, 2, [0.5] * 12)
+    with open(path, "r+b") as file:
+        file.truncate(100)
+    with Checkpoint(path, "key", 4, 4) as checkpoint:
+        assert not checkpoint.resumed
+        assert checkpoint.canvas[1, 1][0] == 0
+        checkpoint.blit(0, 0, 2, 2, [0.5] * 12)
+    Checkpoint(tmp_path / "other.checkpoint", "key", 2, 2).close()
+    (tmp_path / "other.checkpoint").replace(path)
+    with Checkpoint(path, "key", 4, 4) as checkpoint:
+        assert not checkpoint.resumed
+        assert (checkpoint.canvas.width, checkpoint.canvas.height) == (4, 4)
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from math import pi
+
+from pytest import fixture, mark, raises
+
+from tracer import Camera, Canvas, Matrix, point, vector, World
+from tracer.executors import (
+    FuturesExecutor,
+    ProcessExecutor,
+    resolve,
+    SerialExecutor,
+    ThreadExecutor,
+)
+
+
+@fixture
+def camera() -> Camera:
+    return Camera(9, 7, pi / 2, transform=Matrix.view(point(0, 0, -5), point(0, 0, 0), vector(0, 1, 0)))
+
+
+@mark.parametrize(
+    "executor, expected",
+    [
+        [None, ProcessExecutor],
+        ["process", ProcessExecutor],
+        ["thread", ThreadExecutor],
+        ["serial", SerialExecutor],
+    ]
+)
+def test_resolve_names(executor, expected):
+    assert type(resolve(executor)) is expected
+
+
+def test_resolve_workers():
+    assert resolve("thread", 3).workers == 3
+    assert resolve("process", 2).workers == 2
+    backend = SerialExecutor()
+    assert resolve(backend) is backend
+
+
+def test_resolve_wraps_futures_executors():
+    with ThreadPoolExecutor(2) as pool:
+        backend = resolve(pool)
+        assert isinstance(backend, FuturesExecutor)
+        assert backend.executor is pool
+
+
+@mark.parametrize("executor, workers", [["gpu", None], ["thread", 0], ["serial", 2], [SerialExecutor(), 2]])
+def test_resolve_rejects_bad_values(executor, workers):
+    with raises(ValueError):
+        resolve(executor, workers)
+
+
+def test_resolve_rejects_unknown_types():
+    with raises(TypeError):
+        resolve(4)
+
+
+@mark.parametrize("executor, workers", [["serial", None], ["thread", 2], ["process", 2]])
+def test_render_with_every_backend(camera, executor, workers):
+    world = World.default()
+    expected = camera.render(world, executor="serial")
+    image = camera.render(world, tile_size=3, executor=executor, workers=workers)
+    assert list(image) == list(expected)
+    for y in range(camera.vertical_pixels):
+        for x in range(camera.horizontal_pixels):
+            assert expected[x, y] == world.color_at(camera.ray_for_pixel(x, y))
+
+
+def test_render_with_borrowed_executor(camera):
+    world = World.default()
+    with ThreadPoolExecutor(2) as pool:
+        image = camera.render(world, tile_size=4, executor=pool)
+        assert pool.submit(int, "1").result() == 1
+    assert list(image) == list(camera.render(world, executor="serial"))
+
+
+def test_render_into_shared_framebuffer(camera):
+    world = World.default()
+    image = camera.render(world, tile_size=4, executor=ProcessExecutor(2, shared_framebuffer=True))
+    assert list(image) == list(camera.render(world, executor="serial"))
+
+
+@mark.parametrize("executor, workers", [["serial", None], ["process", 2]])
+def test_render_into_mapped_canvas(camera, tmp_path, executor, workers):
+    world = World.default()
+    path = tmp_path / "frame.bin"
+    canvas = Canvas(camera.horizontal_pixels, camera.vertical_pixels, storage="mmap", path=path)
+    with canvas:
+        assert camera.render(world, tile_size=4, executor=executor, workers=workers, canvas=canvas) is canvas
+    with Canvas.open(path) as reopened:
+        assert list(reopened) == list(camera.render(world, executor="serial"))
+
+
+def test_render_rejects_mismatched_canvas(camera):
+    with raises(ValueError):
+        camera.render(World.default(), executor="serial", canvas=Canvas(2, 2))
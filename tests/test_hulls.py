@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from math import pi, sqrt
+from math import isclose, pi, sqrt
 from unittest.mock import Mock
 
 from pytest import mark
@@ -8,6 +8,8 @@ from pytest import mark
 from tracer import (
     AbstractHull,
     EPSILON,
+    FoldedSphere,
+    HitBuffer,
     Intersection,
     Intersections,
     Ray,
@@ -58,6 +60,24 @@ def test_hull_instantiate_with_transform(hull_type: type):
     assert shape.transform == transforms.translation(1, 2, 3)
 
 
+@mark.parametrize("hull_type", hull_types)
+def test_hull_caches_inverse_transforms(hull_type: type):
+    shape = hull_type(transform=transforms.scaling(2, 2, 2))
+    assert shape.inverse_transform == transforms.scaling(0.5, 0.5, 0.5)
+    shape.transform = transforms.translation(2, 3, 4)
+    assert shape.inverse_transform == transforms.translation(-2, -3, -4)
+    assert shape.normal_transform == transforms.translation(-2, -3, -4).transpose()
+
+
+@mark.parametrize("hull_type", hull_types)
+def test_hull_with_singular_transform_builds(hull_type: type):
+    flattened = Matrix(1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+    shape = hull_type(transform=flattened)
+    assert shape.transform == flattened
+    shape.transform = transforms.translation(1, 0, 0)
+    assert shape.inverse_transform == transforms.translation(-1, 0, 0)
+
+
 @mark.parametrize("hull_type", hull_types)
 def test_hull_default_material(hull_type: type):
     shape = hull_type()
@@ -292,3 +312,112 @@ def test_plane__intersects(_input: Ray, expected: Intersections[Intersection]):
     plane = Plane()
     intersections = plane._intersects(_input)
     assert intersections == expected
+
+
+def test_hit_buffer():
+    sphere = Sphere()
+    plane = Plane()
+    buffer = HitBuffer()
+    buffer.add(sphere, (5, -1))
+    buffer.add(plane, (2,))
+
+    assert len(buffer) == 3
+    assert list(buffer.distances) == [5, -1, 2]
+    assert list(buffer.hull_indices) == [0, 0, 1]
+    assert buffer.hit() == Intersection(2, plane)
+    assert buffer.intersections() == Intersections(
+        (Intersection(-1, sphere), Intersection(2, plane), Intersection(5, sphere))
+    )
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.hit() is None
+
+
+def test_hull_record_hits():
+    sphere = Sphere(transform=transforms.scaling(2, 2, 2))
+    buffer = HitBuffer()
+    sphere.record_hits(Ray(point(0, 0, -5), vector(0, 0, 1)), buffer)
+    sphere.record_hits(Ray(point(0, 5, -5), vector(0, 0, 1)), buffer)
+    assert list(buffer.distances) == [3, 7]
+    assert buffer.hulls == [sphere]
+
+
+def test_prepare_computations_is_lazy():
+    ray = Ray(point(0, 0, -5), vector(0, 0, 1))
+    shape = Sphere()
+    shape.normal_at = Mock(return_value=vector(0, 0, -1))
+    computations = Intersection(4, shape).prepare_computations(ray)
+
+    assert computations.point == point(0, 0, -1)
+    shape.normal_at.assert_not_called()
+    assert computations.over_point.z < computations.point.z
+    assert computations.normal_vector == vector(0, 0, -1)
+    shape.normal_at.assert_called_once()
+
+
+@mark.parametrize(
+    "transform, expected",
+    [
+        [Matrix.identity, FoldedSphere(point(0, 0, 0), 1)],
+        [transforms.translation(1, 2, 3).scale(2, 2, 2), FoldedSphere(point(2, 4, 6), 2)],
+        [transforms.rotation_y(pi / 3).scale(0.5, 0.5, 0.5).translate(0, 1, 0), FoldedSphere(point(0, 1, 0), 0.5)],
+        [transforms.scaling(1, 2, 1), None],
+        [transforms.shearing(1, 0, 0, 0, 0, 0), None],
+    ]
+)
+def test_sphere_folding(transform, expected):
+    folded = Sphere(transform=transform).folded
+    if expected is None:
+        assert folded is None
+    else:
+        assert folded.center == expected.center
+        assert isclose(folded.radius, expected.radius)
+
+
+@mark.parametrize(
+    "transform, folds",
+    [
+        [Matrix.identity, True],
+        [transforms.rotation_x(pi / 2).translate(0, 0, 5), True],
+        [transforms.rotation_z(0.3).rotate_y(1.2).translate(1, -2, 3), True],
+        [transforms.scaling(2, 2, 2), False],
+        [transforms.shearing(0, 0, 1, 0, 0, 0), False],
+    ]
+)
+def test_plane_folding(transform, folds):
+    assert (Plane(transform=transform).folded is not None) == folds
+
+
+@mark.parametrize(
+    "hull",
+    [
+        Sphere(transform=transforms.rotation_z(0.7).scale(1.5, 1.5, 1.5).translate(0.5, -0.25, 1)),
+        Sphere(origin=point(0.5, 0, 0), transform=transforms.scaling(2, 2, 2)),
+        Plane(transform=transforms.rotation_x(0.4).rotate_z(-0.2).translate(0, -1, 2)),
+    ]
+)
+def test_folded_hull_matches_matrix_path(hull):
+    assert hull.folded is not None
+    for direction in [vector(0, 0, 1), vector(0.3, -0.2, 1), vector(-0.5, 0.4, 0.8)]:
+        ray = Ray(point(0.1, 0.2, -6), direction.normalize())
+        expected = hull._distances(ray.transform(hull.inverse_transform))
+        actual = hull.folded.distances(ray)
+        assert len(actual) == len(expected)
+        for distance, expected_distance in zip(actual, expected):
+            assert isclose(distance, expected_distance, abs_tol=EPSILON)
+            world_point = ray.position(distance)
+            local_point = hull.inverse_transform.transform_point(world_point)
+            x, y, z, _ = hull.normal_transform.transform_vector(hull._normal_at(local_point))
+            assert hull.normal_at(world_point) == vector(x, y, z).normalize()
+
+
+def test_hull_refolds_after_transform_change():
+    sphere = Sphere(transform=transforms.translation(1, 0, 0))
+    assert sphere.folded.center == point(1, 0, 0)
+    sphere.transform = transforms.scaling(1, 2, 3)
+    assert sphere.folded is None
+    sphere.transform = transforms.translation(0, 2, 0)
+    assert sphere.folded.center == point(0, 2, 0)
+    sphere.origin = point(1, 0, 0)
+    assert sphere.folded.center == point(1, 2, 0)
@@ -0,0 +1,119 @@
+import struct
+import zlib
+from array import array
+
+from pytest import mark, raises
+
+from tracer import Canvas, Color
+from tracer import images
+from tracer.images import P3Writer, P6Writer, PFMWriter, PNGWriter, quantize, writer_for
+
+
+def sample_canvas(storage="list") -> Canvas:
+    canvas = Canvas(3, 2, storage=storage)
+    canvas[0, 0] = Color(1.5, 0, 0)
+    canvas[1, 0] = Color(0, 0.5, 0)
+    canvas[2, 1] = Color(-0.5, 0.25, 1)
+    return canvas
+
+
+def read_png(data: bytes):
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    position = 8
+    chunks = []
+    while position < len(data):
+        length, = struct.unpack(">I", data[position:position + 4])
+        kind = data[position + 4:position + 8]
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+        assert crc == zlib.crc32(kind + body)
+        chunks.append((kind, body))
+        position += 12 + length
+    return chunks
+
+
+def test_quantize():
+    assert quantize([-1, 0, 0.5, 1, 2]) == bytes([0, 0, 128, 255, 255])
+
+
+@mark.parametrize(
+    "file_name, format, expected",
+    [
+        ["image.ppm", None, P3Writer],
+        ["image.PPM", "p6", P6Writer],
+        ["image.pfm", None, PFMWriter],
+        ["image.png", None, PNGWriter],
+        ["image.bin", "PNG", PNGWriter],
+    ]
+)
+def test_writer_for(file_name, format, expected):
+    assert writer_for(file_name, format) is expected
+
+
+@mark.parametrize("file_name", ["image.jpg", "image", "image.PPM"])
+def test_writer_for_falls_back_to_p3(file_name):
+    assert writer_for(file_name) is P3Writer
+
+
+@mark.parametrize("file_name, format", [["image.ppm", "gif"], ["image.jpg", "jpeg"]])
+def test_writer_for_unknown_formats(file_name, format):
+    with raises(ValueError):
+        writer_for(file_name, format)
+
+
+@mark.parametrize("storage", ["list", "array"])
+def test_save_p6(tmp_path, storage):
+    path = tmp_path / "image.ppm"
+    sample_canvas(storage).save(path, format="p6")
+    assert path.read_bytes() == b"P6\n3 2\n255\n" + bytes([255, 0, 0, 0, 128, 0] + [0] * 9 + [0, 64, 255])
+
+
+def test_save_pfm(tmp_path):
+    path = tmp_path / "image.pfm"
+    sample_canvas().save(path)
+    data = path.read_bytes()
+    header = b"PF\n3 2\n-1.0\n"
+    assert data.startswith(header)
+    values = array("f")
+    values.frombytes(data[len(header):])
+    # Bottom row first, and no clamping.
+    assert list(values) == [0] * 6 + [-0.5, 0.25, 1] + [1.5, 0, 0, 0, 0.5, 0] + [0] * 3
+
+
+def test_save_png(tmp_path):
+    path = tmp_path / "image.png"
+    sample_canvas().save(path)
+    chunks = read_png(path.read_bytes())
+    kinds = [kind for kind, _ in chunks]
+    assert kinds[0] == b"IHDR" and kinds[-1] == b"IEND"
+    assert struct.unpack(">IIBBBBB", chunks[0][1]) == (3, 2, 8, 2, 0, 0, 0)
+    pixels = zlib.decompress(b"".join(body for kind, body in chunks if kind == b"IDAT"))
+    assert pixels == bytes([0, 255, 0, 0, 0, 128, 0, 0, 0, 0] + [0] * 7 + [0, 64, 255])
+
+
+def test_png_splits_large_images_into_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(PNGWriter, "chunk_size", 16)
+    path = tmp_path / "image.png"
+    canvas = Canvas(20, 20, storage="array")
+    for x in range(20):
+        canvas[x, x] = Color(x / 20, 1, 0.5)
+    canvas.save(path)
+    chunks = read_png(path.read_bytes())
+    idat = [body for kind, body in chunks if kind == b"IDAT"]
+    assert len(idat) > 1
+    rows = zlib.decompress(b"".join(idat))
+    assert len(rows) == 20 * (1 + 20 * 3)
+    assert rows[1 + 61 * 5 + 15:1 + 61 * 5 + 18] == quantize([0.25, 1, 0.5])
+
+
+def test_quantize_without_numpy(monkeypatch):
+    values = [-1, 0, 0.001, 0.5, 0.998, 1, 2, 127.5 / 255]
+    expected = quantize(values)
+    monkeypatch.setattr(images, "numpy", None)
+    assert quantize(values) == expected == bytes([0, 0, 0, 128, 254, 255, 255, 128])
+
+
+def test_save_unrecognised_extension_as_p3(tmp_path):
+    path = tmp_path / "image.out"
+    sample_canvas().save(path)
+    assert path.read_text().startswith("P3\n3 2\n255\n")
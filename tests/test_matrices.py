@@ -1,6 +1,9 @@
-from math import isclose
+import pickle
+from math import isclose, pi
 
-from tracer import Matrix, Vector, EPSILON
+from pytest import mark, raises
+
+from tracer import Matrix, Matrix4, Vector, EPSILON, point, transforms, vector
 
 
 def test_matrix_4x4():
@@ -342,3 +345,168 @@ def test_multiply_matrix_product_by_component_inverse():
 
     product = left @ right
     assert product @ right.inverse() == left
+
+
+@mark.parametrize(
+    "matrix",
+    [
+        Matrix(
+            -5, 2, 6, -8,
+            1, -5, 1, 8,
+            7, 7, -6, -7,
+            1, -3, 7, 4
+        ),
+        Matrix(
+            9, 3, 0, 9,
+            -5, -2, -6, -3,
+            -4, 9, 6, 4,
+            -7, 6, 6, 2
+        ),
+        Matrix(
+            1, 2, 6,
+            -5, 8, -4,
+            2, 6, 4
+        ),
+    ]
+)
+def test_matrix_closed_form_matches_cofactor_reference(matrix):
+    assert matrix.determinant() == matrix.cofactor_determinant()
+    assert matrix.inverse() == matrix.cofactor_inverse()
+
+
+def test_matrix_inverse_3_by_3():
+    matrix = Matrix(
+        3, 5, 0,
+        2, -1, -7,
+        6, -1, 5
+    )
+
+    assert matrix @ matrix.inverse() == Matrix(
+        1, 0, 0,
+        0, 1, 0,
+        0, 0, 1
+    )
+
+
+def test_matrix_inverse_2_by_2():
+    matrix = Matrix(
+        4, 7,
+        2, 6
+    )
+
+    assert matrix.inverse() == Matrix(
+        0.6, -0.7,
+        -0.2, 0.4
+    )
+
+
+def test_matrix_inverse_not_invertible():
+    matrix = Matrix(
+        -4, 2, -2, -3,
+        9, 6, 2, 6,
+        0, -5, 1, -5,
+        0, 0, 0, 0
+    )
+
+    with raises(ZeroDivisionError):
+        matrix.inverse()
+
+
+def test_matrix_is_immutable():
+    matrix = Matrix.identity.translate(1, 2, 3)
+
+    with raises(AttributeError):
+        matrix.size = 3
+    with raises(TypeError):
+        matrix[0, 3] = 5
+
+
+def test_matrix_hashable():
+    cache = {Matrix.identity.scale(2, 2, 2): "scaled"}
+
+    assert cache[Matrix.identity.scale(2, 2, 2)] == "scaled"
+    assert Matrix.identity.translate(1, 2, 3) not in cache
+
+
+def test_matrix_hash_agrees_with_approximate_equality():
+    composed = Matrix.identity.rotate_x(pi / 2)
+    written = Matrix(
+        1, 0, 0, 0,
+        0, 0, -1, 0,
+        0, 1, 0, 0,
+        0, 0, 0, 1
+    )
+
+    assert composed == written
+    assert hash(composed) == hash(written)
+    assert {composed: "rotated"}[written] == "rotated"
+
+    near = Matrix.identity.translate(0.000014, 0, 0)
+    nearer = Matrix.identity.translate(0.000016, 0, 0)
+    assert near == nearer
+    assert hash(near) == hash(nearer)
+    assert {near: 1}.get(nearer) == 1
+
+
+def test_matrix_memoises_derived_values():
+    matrix = Matrix.identity.translate(1, 2, 3).rotate_x(1)
+
+    assert matrix.inverse() is matrix.inverse()
+    assert matrix.inverse().inverse() is matrix
+    assert matrix.transpose() is matrix.transpose()
+    assert matrix.transpose().transpose() is matrix
+    assert matrix.determinant() == matrix.cofactor_determinant()
+
+
+def test_matrix_pickles():
+    matrix = Matrix.identity.translate(1, 2, 3)
+
+    assert pickle.loads(pickle.dumps(matrix)) == matrix
+
+
+def test_matrix4_matches_generic_matrix():
+    left = Matrix(
+        3, -9, 7, 3,
+        3, -8, 2, -9,
+        -4, 4, 4, 1,
+        -6, 5, -1, 1
+    )
+    right = Matrix(
+        8, 2, 2, 2,
+        3, -1, 7, 0,
+        7, 0, 5, 4,
+        6, -2, 0, 5
+    )
+
+    product = Matrix4(*left) @ right
+    assert isinstance(product, Matrix4)
+    assert product == left @ right
+    assert Matrix4(*left) * Vector(1, 2, 3, 1) == left * Vector(1, 2, 3, 1)
+    assert Matrix4(*left).transpose() == left.transpose()
+
+
+def test_matrix4_requires_sixteen_values():
+    with raises(ValueError):
+        Matrix4(1, 0, 0, 1)
+
+
+def test_matrix4_transform_point_and_vector():
+    transform = transforms.translation(1, 2, 3).scale(2, 2, 2)
+
+    assert transform.transform_point(point(1, 1, 1)) == point(4, 6, 8)
+    assert transform.transform_vector(vector(1, 1, 1)) == vector(2, 2, 2)
+
+
+def test_four_by_four_results_are_matrix4():
+    matrix = Matrix(
+        6, 4, 4, 4,
+        5, 5, 7, 6,
+        4, -9, 3, -7,
+        9, 1, 7, -6
+    )
+
+    assert isinstance(Matrix.identity, Matrix4)
+    assert isinstance(transforms.rotation_x(1), Matrix4)
+    assert isinstance(Matrix.view(point(1, 3, 2), point(4, -2, 8), vector(1, 1, 0)), Matrix4)
+    assert isinstance(matrix.inverse(), Matrix4)
+    assert isinstance(matrix @ matrix, Matrix4)
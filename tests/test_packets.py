@@ -0,0 +1,97 @@
+from math import pi
+
+from pytest import fixture, importorskip, mark, raises
+
+from tracer import (
+    Camera,
+    CheckeredPattern,
+    Color,
+    Light,
+    Material,
+    Matrix,
+    Plane,
+    point,
+    Ray,
+    SolidPattern,
+    Sphere,
+    transforms,
+    vector,
+    World,
+)
+
+importorskip("numpy")
+
+from tracer.packets import PacketEngine, RayPacket
+
+
+def patterned_world() -> World:
+    world = World.default()
+    world.children.append(
+        Plane(
+            transform=transforms.translation(0, -1, 0),
+            material=Material(
+                pattern=CheckeredPattern(
+                    first_pattern=SolidPattern(color=Color(0.2, 0.5, 0.2)),
+                    second_pattern=SolidPattern(color=Color(0.4, 0.1, 0.4))
+                ),
+                specular=0.1
+            )
+        )
+    )
+    world.children.append(Sphere(transform=transforms.translation(1.5, 0.5, -1).scale(0.5, 0.5, 0.5)))
+    return world
+
+
+@fixture
+def camera() -> Camera:
+    return Camera(21, 15, pi / 2, transform=Matrix.view(point(0, 1.5, -5), point(0, 0, 0), vector(0, 1, 0)))
+
+
+def test_ray_packet_for_pixels_matches_camera(camera):
+    packet = RayPacket.for_pixels(camera, [0, 10, 20], [0, 7, 14])
+    for ray, (x, y) in zip(packet.rays(), [(0, 0), (10, 7), (20, 14)]):
+        assert ray == camera.ray_for_pixel(x, y)
+
+
+@mark.parametrize("world", [World.default(), patterned_world()])
+def test_packet_engine_matches_color_at(camera, world):
+    rays = [camera.ray_for_pixel(x, y) for y in range(camera.vertical_pixels) for x in range(camera.horizontal_pixels)]
+    colors = PacketEngine(world).colors_at(RayPacket.from_rays(rays))
+    for ray, color in zip(rays, colors):
+        assert color == world.color_at(ray)
+
+
+def test_packet_engine_intersect_misses():
+    engine = PacketEngine(World.default())
+    packet = RayPacket.from_rays([Ray(point(0, 0, -5), vector(0, 1, 0)), Ray(point(0, 0, -5), vector(0, 0, 1))])
+    distances, hulls = engine.intersect(packet.origins, packet.directions)
+    assert list(hulls) == [-1, 0]
+    assert distances[1] == 4
+
+
+def test_packet_engine_requires_supported_world():
+    assert not PacketEngine.supports(World())
+    with raises(ValueError):
+        PacketEngine(World())
+
+
+def test_camera_render_packets(camera):
+    world = patterned_world()
+    image = camera.render_packets(world, scanlines=4)
+    for x, y in [(0, 0), (10, 7), (20, 14), (3, 12)]:
+        assert image[x, y] == world.color_at(camera.ray_for_pixel(x, y))
+
+
+def test_packet_engine_color_at_many(camera):
+    world = patterned_world()
+    rays = [camera.ray_for_pixel(x, 7) for x in range(camera.horizontal_pixels)]
+    assert PacketEngine(world).color_at_many(rays) == world.color_at_many(rays)
+
+
+def test_packet_engine_empty_batch(camera):
+    world = patterned_world()
+    engine = PacketEngine(world)
+    assert len(RayPacket.from_rays([])) == 0
+    assert engine.color_at(RayPacket.from_rays([])).shape == (0, 3)
+    assert engine.color_at_many([]) == world.color_at_many([]) == []
+    assert len(RayPacket.for_pixels(camera, [], [])) == 0
@@ -96,6 +96,13 @@ def test_abstract_pattern_assign_transform():
     assert pattern.transform == transforms.rotation_z(1)
 
 
+def test_abstract_pattern_assign_transform_updates_inverse():
+    pattern = PatternTestable()
+    pattern.transform = transforms.scaling(2, 2, 2)
+    assert pattern.inverse_transform == transforms.scaling(0.5, 0.5, 0.5)
+    assert pattern.color_internal(point(2, 3, 4)) == Color(1, 1.5, 2)
+
+
 @mark.parametrize(
     "input_point, expected_color",
     [
@@ -194,3 +194,20 @@ def test_color_multiply_by_scalar():
 
 def test_color_multiply_by_color():
     assert Color(1, 0.2, 0.4) * Color(0.9, 1, 0.1) == Color(0.9, 0.2, 0.04)
+
+
+def test_tuple_inequality_uses_tolerance():
+    assert not vector(1, 2, 3) != vector(1 + EPSILON / 2, 2, 3)
+    assert vector(1, 2, 3) != vector(1.1, 2, 3)
+    assert not Color(0.5, 0.5, 0.5) != Color(0.5, 0.5, 0.5 + EPSILON / 2)
+
+
+def test_cant_multiply_color_by_tuple():
+    with raises(ValueError):
+        value = Color(1, 1, 1) * Vector(2, 3, 4, 5)
+
+
+def test_tuple_reflect_matches_definition():
+    _vector = vector(1, -1, 0.5)
+    normal = vector(0, 1, 0)
+    assert _vector.reflect(normal) == _vector - normal * 2 * _vector.dot(normal)
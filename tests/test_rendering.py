@@ -1,3 +1,5 @@
+from pytest import approx, mark, raises
+
 from tracer import Canvas, Color, BLACK, RED
 
 
@@ -68,3 +70,104 @@ def test_ends_with_new_line(tmp_path):
     canvas.save(test_file_path)
     with open(test_file_path) as ppm:
         assert ppm.readlines()[-1].endswith("\n")
+
+
+@mark.parametrize("storage, typecode", [["list", "d"], ["array", "d"], ["array", "f"]])
+def test_canvas_storage_modes(storage, typecode):
+    canvas = Canvas(4, 3, default=Color(0.5, 0.25, 0), storage=storage, typecode=typecode)
+    assert canvas[3, 2] == Color(0.5, 0.25, 0)
+    canvas[1, 2] = RED
+    assert canvas[1, 2] == RED
+    assert len(list(canvas)) == 12
+    canvas.blit(1, 0, 2, 2, [0.1] * 6 + [0.2] * 6)
+    assert canvas[2, 0] == Color(0.1, 0.1, 0.1)
+    assert canvas[1, 1] == Color(0.2, 0.2, 0.2)
+    assert list(canvas.tile(1, 0, 2, 2)) == approx([0.1] * 6 + [0.2] * 6)
+    canvas.set_row(2, [1, 0, 0] * 4)
+    assert list(canvas.row(2)) == [1, 0, 0] * 4
+    assert canvas[0, 2] == RED
+
+
+def test_array_canvas_buffer():
+    canvas = Canvas(3, 2, storage="array")
+    canvas[2, 1] = Color(0.25, 0.5, 1)
+    view = canvas.buffer()
+    assert view.format == "d"
+    assert len(view) == 18
+    assert list(view[15:18]) == [0.25, 0.5, 1]
+    view[0] = 1
+    assert canvas[0, 0] == RED
+    assert canvas.pixels[-1] == Color(0.25, 0.5, 1)
+    assert canvas.pixels[0:2] == [RED, BLACK]
+
+
+def test_list_canvas_has_no_buffer():
+    with raises(ValueError):
+        Canvas(2, 2).buffer()
+    with raises(ValueError):
+        Canvas(2, 2, storage="numpy")
+
+
+def test_save_array_canvas(tmp_path):
+    listed = Canvas(10, 2, default=Color(1, 0.8, 0.6))
+    packed = Canvas(10, 2, default=Color(1, 0.8, 0.6), storage="array")
+    listed.save(tmp_path / "listed.ppm")
+    packed.save(tmp_path / "packed.ppm")
+    assert (tmp_path / "listed.ppm").read_text() == (tmp_path / "packed.ppm").read_text()
+
+
+def test_mapped_canvas(tmp_path):
+    path = tmp_path / "canvas.bin"
+    with Canvas(4, 3, default=Color(0.5, 0.25, 0), storage="mmap", path=path) as canvas:
+        assert canvas[3, 2] == Color(0.5, 0.25, 0)
+        canvas[1, 2] = RED
+        canvas.blit(0, 0, 2, 1, [0.1] * 6)
+        assert canvas.buffer().format == "d"
+        canvas.save(tmp_path / "mapped.ppm")
+    with Canvas.open(path) as reopened:
+        assert (reopened.width, reopened.height, reopened.storage) == (4, 3, "mmap")
+        assert reopened[1, 2] == RED
+        assert reopened[1, 0] == Color(0.1, 0.1, 0.1)
+        assert reopened[3, 2] == Color(0.5, 0.25, 0)
+        reopened.save(tmp_path / "reopened.ppm")
+    assert (tmp_path / "mapped.ppm").read_text() == (tmp_path / "reopened.ppm").read_text()
+
+
+def test_mapped_canvas_float32(tmp_path):
+    path = tmp_path / "canvas.bin"
+    Canvas(2, 2, storage="mmap", typecode="f", path=path).close()
+    assert path.stat().st_size == 24 + 2 * 2 * 3 * 4
+    with Canvas.open(path) as canvas:
+        assert canvas.typecode == "f"
+        assert list(canvas) == [BLACK] * 4
+
+
+def test_mapped_canvas_errors(tmp_path):
+    with raises(ValueError):
+        Canvas(2, 2, storage="mmap")
+    (tmp_path / "other.bin").write_bytes(b"\0" * 64)
+    with raises(ValueError):
+        Canvas.open(tmp_path / "other.bin")
+    (tmp_path / "short.bin").write_bytes(b"TRCANVAS")
+    with raises(ValueError):
+        Canvas.open(tmp_path / "short.bin")
+
+
+def test_mapped_canvas_size_must_match_header(tmp_path):
+    path = tmp_path / "canvas.bin"
+    Canvas(4, 3, storage="mmap", path=path).close()
+    with open(path, "r+b") as file:
+        file.truncate(24 + 4 * 3 * 3 * 8 - 8)
+    with raises(ValueError, match="truncated"):
+        Canvas.open(path)
+
+
+def test_mapped_canvas_close_with_a_held_buffer(tmp_path):
+    canvas = Canvas(4, 4, storage="mmap", path=tmp_path / "canvas.bin")
+    view = canvas.buffer()
+    with raises(BufferError):
+        canvas.close()
+    canvas[1, 1] = RED
+    assert view[15] == 1
+    view.release()
+    canvas.close()
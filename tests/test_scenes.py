@@ -0,0 +1,235 @@
+import pickle
+from math import inf, pi
+from random import Random
+
+from pytest import fixture, raises
+
+from tracer import (
+    Camera,
+    CheckeredPattern,
+    Color,
+    CompiledScene,
+    Light,
+    Material,
+    Matrix,
+    Plane,
+    point,
+    Ray,
+    SharedScene,
+    SolidPattern,
+    Sphere,
+    transforms,
+    vector,
+    World,
+)
+
+
+def mixed_world() -> World:
+    world = World.default()
+    world.children.extend([
+        Plane(
+            transform=transforms.translation(0, -1, 0),
+            material=Material(
+                pattern=CheckeredPattern(
+                    first_pattern=SolidPattern(color=Color(0.2, 0.5, 0.2)),
+                    second_pattern=SolidPattern(color=Color(0.4, 0.1, 0.4))
+                ),
+                specular=0
+            )
+        ),
+        Plane(transform=transforms.scaling(2, 2, 2).rotate_x(pi / 2).translate(0, 0, 10)),
+        Sphere(transform=transforms.scaling(0.5, 1, 0.5).translate(1.5, 0.5, -1)),
+        Sphere(transform=transforms.shearing(0.5, 0, 0, 0, 0, 0).translate(-1.5, 0, 0)),
+    ])
+    return world
+
+
+@fixture
+def camera() -> Camera:
+    return Camera(21, 15, pi / 2, transform=Matrix.view(point(0, 1.5, -5), point(0, 0, 0), vector(0, 1, 0)))
+
+
+def test_compile_sorts_hulls_by_kind():
+    scene = mixed_world().compile()
+    assert len(scene) == 6
+    assert list(scene.sphere_ids) == [0, 1]
+    assert list(scene.plane_ids) == [2]
+    assert list(scene.general_ids) == [3, 4, 5]
+    assert list(scene.sphere_radii) == [1, 0.5]
+    assert list(scene.plane_normals) == [0, 1, 0]
+    assert list(scene.plane_offsets) == [-1]
+    assert len(scene.inverse_transforms) == 16 * 6
+    assert list(scene.ambient) == [0.1] * 6
+    assert list(scene.specular) == [0.2, 0.9, 0, 0.9, 0.9, 0.9]
+
+
+def test_compiled_scene_matches_world(camera):
+    world = mixed_world()
+    scene = world.compile()
+    for y in range(camera.vertical_pixels):
+        for x in range(camera.horizontal_pixels):
+            ray = camera.ray_for_pixel(x, y)
+            hit = world.closest_hit(ray)
+            hull_id, distance = scene.closest_hit(ray)
+            if hit is None:
+                assert (hull_id, distance) == (-1, inf)
+            else:
+                assert world.children[hull_id] is hit.hull
+                assert abs(distance - hit.distance) < 1e-9
+            assert scene.color_at(ray) == world.color_at(ray)
+
+
+def test_compiled_scene_occlusion():
+    scene = World.default().compile()
+    ray = Ray(point(0, 0, -5), vector(0, 0, 1))
+    assert scene.is_occluded(ray, 5)
+    assert not scene.is_occluded(ray, 4)
+    assert not scene.is_occluded(Ray(point(0, 5, -5), vector(0, 0, 1)), inf)
+
+
+def test_compiled_scene_normals():
+    scene = mixed_world().compile()
+    assert scene.normal_at(0, point(0, 0, -1)) == vector(0, 0, -1)
+    assert scene.normal_at(2, point(3, -1, 4)) == vector(0, 1, 0)
+    assert scene.normal_at(4, point(1.5, 0.5, -1.5)) == vector(0, 0, -1)
+
+
+def test_compiled_scene_is_a_snapshot():
+    world = World.default()
+    scene = world.compile()
+    world.children.append(Plane())
+    assert len(scene) == 2
+    ray = Ray(point(0, 5, 0), vector(0, -1, 0))
+    assert scene.closest_hit(ray) == (0, 4)
+
+
+def test_compiled_scene_is_read_only():
+    scene = World.default().compile()
+    with raises(AttributeError):
+        scene.sphere_radii = None
+    with raises(AttributeError):
+        del scene.hulls
+
+
+def test_compiled_scene_pickles(camera):
+    scene = mixed_world().compile()
+    copy = pickle.loads(pickle.dumps(scene))
+    assert copy.sphere_centers == scene.sphere_centers
+    ray = camera.ray_for_pixel(10, 7)
+    assert copy.color_at(ray) == scene.color_at(ray)
+
+
+def test_compiled_scene_needs_a_light():
+    scene = World([Sphere()]).compile()
+    assert scene.closest_hit(Ray(point(0, 0, -5), vector(0, 0, 1))) == (0, 4)
+    with raises(ValueError):
+        scene.color_at(Ray(point(0, 0, -5), vector(0, 0, 1)))
+
+
+def test_compiled_scene_updated():
+    world = World.default()
+    scene = world.compile()
+    moved = Sphere(transform=transforms.translation(0, 0, 10))
+    light = Light(point(10, 10, -10), Color(0.5, 0.5, 0.5))
+    updated = scene.updated({0: moved}, light)
+    assert updated.hulls == (moved, world.children[1])
+    assert updated.light == light
+    assert scene.light == world.light
+    assert scene.updated({}).light == world.light
+    assert list(updated.sphere_centers[:3]) == [0, 0, 10]
+    with raises(IndexError):
+        scene.updated({2: moved})
+
+
+def test_shared_scene_round_trip(camera):
+    scene = mixed_world().compile()
+    with SharedScene(scene) as shared:
+        attached = SharedScene.attach(shared.name)
+        copy = attached.scene
+        assert list(copy.sphere_centers) == list(scene.sphere_centers)
+        assert list(copy.kinds) == list(scene.kinds)
+        assert list(copy.node_bounds) == list(scene.node_bounds)
+        assert list(copy.node_hull_ids) == list(scene.node_hull_ids)
+        assert copy.hulls[0] is None
+        assert copy.hulls[2] is not None
+        assert copy.light == scene.light
+        for x, y in [(0, 0), (10, 7), (4, 12), (20, 14)]:
+            ray = camera.ray_for_pixel(x, y)
+            assert copy.color_at(ray) == scene.color_at(ray)
+        attached.close()
+
+
+def test_shared_scene_without_hulls():
+    with SharedScene(World().compile()) as shared:
+        attached = SharedScene.attach(shared.name)
+        assert len(attached.scene) == 0
+        assert attached.scene.closest_hit(Ray(point(0, 0, 0), vector(0, 0, 1))) == (-1, inf)
+        attached.close()
+
+
+def test_compiled_scene_digest_is_stable_across_tracing(camera):
+    world = mixed_world()
+    digest = world.compile().digest()
+    for x, y in [(0, 0), (10, 7), (4, 12), (20, 14)]:
+        world.color_at(camera.ray_for_pixel(x, y))
+    assert world.compile().digest() == digest
+
+
+def test_compiled_scene_digest():
+    assert World.default().compile().digest() == World.default().compile().digest()
+    world = World.default()
+    world.children[1].transform = transforms.scaling(0.5, 0.5, 0.6)
+    assert world.compile().digest() != World.default().compile().digest()
+    world = World.default()
+    world.light = Light(point(-10, 10, -11), Color(1, 1, 1))
+    assert world.compile().digest() != World.default().compile().digest()
+
+
+def scattered_spheres(count: int) -> World:
+    random = Random(3)
+    return World(
+        [
+            Sphere(transform=transforms.scaling(0.3, 0.3, 0.3).translate(
+                random.uniform(-20, 20), random.uniform(-20, 20), random.uniform(0, 40)
+            ))
+            for _ in range(count)
+        ] + [Plane(transform=transforms.translation(0, -25, 0))],
+        Light(point(-10, 10, -10), Color(1, 1, 1))
+    )
+
+
+def test_compiled_scene_flattens_a_hierarchy():
+    scene = mixed_world().compile()
+    assert list(scene.unbounded_ids) == [2, 3]
+    assert sorted(scene.node_hull_ids) == [0, 1, 4, 5]
+    assert len(scene.node_bounds) == 6 * len(scene.node_counts)
+    children = mixed_world().children
+    root = children[0].bounds()
+    for hull_id in (1, 4, 5):
+        root = root.union(children[hull_id].bounds())
+    assert list(scene.node_bounds[:6]) == list(root)
+
+
+def test_compiled_scene_does_not_scan_every_hull(monkeypatch):
+    world = scattered_spheres(1000)
+    scene = world.compile()
+    tested = []
+    hit = CompiledScene._hit
+    monkeypatch.setattr(
+        CompiledScene, "_hit", lambda self, hull_id, *ray: tested.append(hull_id) or hit(self, hull_id, *ray)
+    )
+    random = Random(4)
+    for _ in range(20):
+        ray = Ray(point(0, 0, -10), vector(random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5), 1).normalize())
+        tested.clear()
+        hull_id, distance = scene.closest_hit(ray)
+        assert len(tested) < 100
+        expected = world.closest_hit(ray)
+        if expected is None:
+            assert hull_id == -1
+        else:
+            assert world.children[hull_id] is expected.hull
+            assert abs(distance - expected.distance) < 1e-9
+        tested.clear()
+        assert scene.is_occluded(ray, 60) == world.is_occluded(ray, 60)
+        assert len(tested) < 100
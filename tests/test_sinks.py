@@ -0,0 +1,59 @@
+from math import pi
+
+from pytest import raises
+
+from tracer import Camera, Matrix, point, vector, World
+from tracer.sinks import FileSink, RowSink
+
+
+def test_row_sink_emits_rows_in_order():
+    rows = []
+    sink = RowSink(4, 3, lambda y, values: rows.append((y, list(values))))
+    sink.blit(2, 0, 2, 2, [1] * 12)
+    assert rows == []
+    assert sink.pending == 2
+    sink.blit(0, 2, 4, 1, [3] * 12)
+    assert rows == []
+    sink.blit(0, 0, 2, 2, [2] * 12)
+    assert rows == [
+        (0, [2] * 6 + [1] * 6),
+        (1, [2] * 6 + [1] * 6),
+        (2, [3] * 12),
+    ]
+    assert sink.pending == 0
+    sink.close()
+
+
+def test_row_sink_bottom_up():
+    rows = []
+    sink = RowSink(2, 2, lambda y, values: rows.append(y), bottom_up=True)
+    sink.blit(0, 0, 2, 1, [0] * 6)
+    assert rows == []
+    sink.blit(0, 1, 2, 1, [0] * 6)
+    assert rows == [1, 0]
+
+
+def test_row_sink_close_checks_completion():
+    sink = RowSink(2, 2, lambda y, values: None)
+    sink.blit(0, 0, 2, 1, [0] * 6)
+    with raises(ValueError):
+        sink.close()
+
+
+def test_render_to_file_sink_matches_save(tmp_path):
+    world = World.default()
+    camera = Camera(13, 9, pi / 2, transform=Matrix.view(point(0, 0, -5), point(0, 0, 0), vector(0, 1, 0)))
+    expected = camera.render(world, executor="serial")
+    for name in ["image.ppm", "image.png", "image.pfm"]:
+        expected.save(tmp_path / f"expected-{name}")
+        with FileSink(tmp_path / name, camera.horizontal_pixels, camera.vertical_pixels) as sink:
+            camera.render_to(world, sink, tile_size=4, executor="thread", workers=2)
+        assert (tmp_path / name).read_bytes() == (tmp_path / f"expected-{name}").read_bytes()
+
+
+def test_file_sink_keeps_the_original_error(tmp_path):
+    with raises(KeyboardInterrupt):
+        with FileSink(tmp_path / "image.png", 2, 2) as sink:
+            sink.blit(0, 0, 2, 1, [0] * 6)
+            raise KeyboardInterrupt
+    assert sink.stream.closed
@@ -0,0 +1,55 @@
+from array import array
+from math import pi
+
+from pytest import raises
+
+from tracer import Camera, Canvas, Color, Matrix, point, vector, World
+from tracer.tiles import render_tile, SharedFramebuffer, split, Tile
+
+
+def test_split_covers_image():
+    tiles = split(10, 7, 4)
+    assert tiles == [
+        Tile(0, 0, 4, 4), Tile(4, 0, 4, 4), Tile(8, 0, 2, 4),
+        Tile(0, 4, 4, 3), Tile(4, 4, 4, 3), Tile(8, 4, 2, 3),
+    ]
+    assert sum(tile.size for tile in tiles) == 70
+
+
+def test_split_rejects_empty_tiles():
+    with raises(ValueError):
+        split(10, 10, 0)
+
+
+def test_tile_coordinates_are_row_major():
+    assert list(Tile(2, 3, 2, 2).coordinates()) == [(2, 3), (3, 3), (2, 4), (3, 4)]
+
+
+def test_render_tile_packs_colors():
+    world = World.default()
+    camera = Camera(11, 11, pi / 2, transform=Matrix.view(point(0, 0, -5), point(0, 0, 0), vector(0, 1, 0)))
+    tile = Tile(4, 4, 3, 2)
+    buffer = render_tile(camera, world.compile(), tile)
+    assert len(buffer) == tile.size * 3
+    assert Color(*buffer[12:15]) == Color(0.38066, 0.47583, 0.2855)
+
+
+def test_canvas_blit():
+    canvas = Canvas(4, 3)
+    canvas.blit(1, 1, 2, 2, [0.1, 0.2, 0.3] * 3 + [1, 1, 1])
+    assert canvas[1, 1] == Color(0.1, 0.2, 0.3)
+    assert canvas[2, 2] == Color(1, 1, 1)
+    assert canvas[0, 0] == Color(0, 0, 0)
+    assert canvas[3, 2] == Color(0, 0, 0)
+
+
+def test_shared_framebuffer_write_and_read():
+    with SharedFramebuffer(5, 4) as framebuffer:
+        tile = Tile(1, 2, 3, 2)
+        values = array("d", range(tile.size * 3))
+        framebuffer.write(tile, values)
+        assert framebuffer.read(tile) == values
+        attached = SharedFramebuffer.attach(framebuffer.name, 5, 4)
+        assert list(attached.values[(2 * 5 + 1) * 3:(2 * 5 + 1) * 3 + 9]) == list(range(9))
+        assert list(attached.values[:3]) == [0, 0, 0]
+        attached.close()
@@ -211,3 +211,55 @@ def test_chained_transforms_fluent_api():
 def test_matrix_view(from_point, to_point, up_vector, expected_transform):
     transform = Matrix.view(from_point, to_point, up_vector)
     assert transform == expected_transform
+
+
+def test_transform_builder_matches_fluent_api():
+    builder = transforms.TransformBuilder().rotate_x(pi / 2).scale(5, 5, 5).translate(10, 5, 7)
+    transform = builder.build()
+
+    assert transform == Matrix.identity.rotate_x(pi / 2).scale(5, 5, 5).translate(10, 5, 7)
+    assert transform * point(1, 0, 1) == point(15, 0, 7)
+
+
+@mark.parametrize(
+    "builder",
+    [
+        transforms.TransformBuilder(),
+        transforms.TransformBuilder().translate(1, -2, 3).rotate_y(0.3),
+        transforms.TransformBuilder().shear(1, 0.5, 0, 2, 0, 0.25).scale(2, 3, 0.5).rotate_z(1.1),
+        transforms.TransformBuilder().rotate_x(0.2).rotate_y(0.4).rotate_z(0.6).translate(4, 5, 6),
+    ]
+)
+def test_transform_builder_inverse_is_exact(builder):
+    transform = builder.build()
+
+    assert transform.inverse() == transform.cofactor_inverse()
+    assert transform @ transform.inverse() == Matrix.identity
+
+
+def test_transform_builder_is_immutable():
+    base = transforms.TransformBuilder().scale(2, 2, 2)
+    moved = base.translate(1, 0, 0)
+
+    assert base.steps == (("scale", (2, 2, 2)),)
+    assert moved != base
+    assert moved == transforms.TransformBuilder().scale(2, 2, 2).translate(1, 0, 0)
+
+
+def test_chained_transforms_carry_inverse():
+    transform = transforms.translation(1, 2, 3).rotate_x(0.5).shear(0, 1, 0, 0, 0, 0)
+
+    assert transform.inverse() == transform.cofactor_inverse()
+    assert transform.inverse().inverse() is transform
+
+
+def test_degenerate_transforms_build_without_an_inverse():
+    flattened = transforms.scaling(0, 1, 1)
+    sheared = transforms.shearing(1, 0, 1, 0, 0, 0)
+
+    assert flattened * point(2, 3, 4) == point(0, 3, 4)
+    assert sheared * point(1, 1, 0) == point(2, 2, 0)
+    assert not flattened.invertible
+    assert not sheared.invertible
+    assert not transforms.translation(1, 2, 3).scale(0, 1, 1).invertible
+    assert not transforms.TransformBuilder().scale(1, 0, 1).translate(1, 0, 0).build().invertible
@@ -0,0 +1,109 @@
+from math import pi
+
+from pytest import fixture, raises
+
+from tracer import (
+    Camera,
+    Color,
+    Light,
+    Matrix,
+    point,
+    Renderer,
+    Sphere,
+    transforms,
+    vector,
+    World,
+)
+from tracer.tiles import split
+
+
+@fixture
+def camera() -> Camera:
+    return Camera(9, 7, pi / 2, transform=Matrix.view(point(0, 0, -5), point(0, 0, 0), vector(0, 1, 0)))
+
+
+@fixture
+def renderer():
+    with Renderer(workers=2) as renderer:
+        yield renderer
+
+
+def test_renderer_matches_camera_render(renderer, camera):
+    world = World.default()
+    renderer.load(world)
+    image = renderer.render(camera, tile_size=4)
+    assert list(image) == list(camera.render(world, executor="serial"))
+
+
+def test_renderer_reuses_workers_across_frames(renderer, camera):
+    world = World.default()
+    renderer.load(world)
+    first = renderer.render(camera, tile_size=3)
+
+    world.children[0] = Sphere(transform=transforms.translation(0.5, 0, 0))
+    world.light = Light(point(10, 10, -10), Color(1, 1, 1))
+    renderer.update(hulls={0: world.children[0]}, light=world.light)
+    moved = Camera(9, 7, pi / 3, transform=Matrix.view(point(1, 1, -5), point(0, 0, 0), vector(0, 1, 0)))
+    second = renderer.render(moved, tile_size=3)
+
+    assert list(second) == list(moved.render(world, executor="serial"))
+    assert list(first) != list(second)
+    assert renderer.scene.light == world.light
+
+
+def test_renderer_drops_tiles_from_interrupted_frames(renderer, camera):
+    world = World.default()
+    renderer.load(world)
+    renderer.render(camera, tile_size=3)
+    # As if a render was interrupted after queueing its tiles.
+    for tile in split(camera.horizontal_pixels, camera.vertical_pixels, 3):
+        renderer._tasks.put((renderer.version, tile))
+    moved = Camera(9, 7, pi / 3, transform=Matrix.view(point(1, 1, -5), point(0, 0, 0), vector(0, 1, 0)))
+    expected = moved.render(world, executor="serial")
+    assert list(renderer.render(moved, tile_size=3)) == list(expected)
+    assert list(renderer.render(moved, tile_size=3)) == list(expected)
+
+
+def test_renderer_needs_a_scene(renderer, camera):
+    with raises(ValueError):
+        renderer.render(camera)
+    with raises(ValueError):
+        renderer.update(hulls={})
+
+
+def test_renderer_reports_worker_errors(renderer, camera):
+    renderer.load(World([Sphere()]))
+    with raises(RuntimeError):
+        renderer.render(camera)
+    renderer.load(World.default())
+    assert renderer.render(camera)[4, 3] == World.default().color_at(camera.ray_for_pixel(4, 3))
+
+
+def test_renderer_reports_failed_updates(renderer, camera):
+    renderer.load(World.default())
+    renderer._broadcast("delta", ({5: Sphere()}, None))
+    with raises(RuntimeError, match="IndexError"):
+        renderer.render(camera)
+    renderer.load(World.default())
+    assert renderer.render(camera)[4, 3] == World.default().color_at(camera.ray_for_pixel(4, 3))
+
+
+def test_renderer_notices_dead_workers(camera):
+    renderer = Renderer(workers=1)
+    renderer.load(World.default())
+    renderer._processes[0].kill()
+    renderer._processes[0].join()
+    with raises(RuntimeError, match="exited unexpectedly"):
+        renderer.render(camera)
+    assert renderer.closed
+    renderer.close()
+
+
+def test_renderer_close():
+    renderer = Renderer(workers=1)
+    assert renderer.workers == 1
+    renderer.close()
+    renderer.close()
+    assert renderer.closed
+    with raises(ValueError):
+        renderer.load(World.default())
@@ -120,3 +120,76 @@ def test_world_color_at_with_negative_intersection():
 def test_world_is_shadowed(point, expected):
     world = World.default()
     assert world.is_shadowed(point) == expected
+
+
+def test_world_color_at_many():
+    world = World.default()
+    rays = [
+        Ray(point(0, 0, -5), vector(0, 0, 1)),
+        Ray(point(0, 0, -5), vector(0, 1, 0)),
+        Ray(point(0, 0, 0.75), vector(0, 0, -1)),
+        Ray(point(-10, 10, -10), vector(1, -1, 1).normalize()),
+    ]
+    assert world.color_at_many(rays) == [world.color_at(ray) for ray in rays]
+    assert world.color_at_many([]) == []
+
+
+@mark.parametrize(
+    "t_max, expected",
+    [
+        (3.9, False),
+        (4.1, True),
+        (20, True),
+    ]
+)
+def test_world_is_occluded(t_max, expected):
+    world = World.default()
+    ray = Ray(point(0, 0, -5), vector(0, 0, 1))
+    assert world.is_occluded(ray, t_max) == expected
+
+
+def test_world_is_occluded_ignores_hits_behind_and_at_origin():
+    world = World([Sphere()], Light(point(0, 0, -10)))
+    assert not world.is_occluded(Ray(point(0, 0, 5), vector(0, 0, 1)), 100)
+    assert not world.is_occluded(Ray(point(0, 0, -1), vector(0, 0, -1)), 100)
+
+
+def test_hull_occludes_without_intersections():
+    sphere = Sphere(transform=transforms.scaling(2, 2, 2))
+    sphere._intersects = None
+    assert sphere.occludes(Ray(point(0, 0, -5), vector(0, 0, 1)), 4)
+    assert not sphere.occludes(Ray(point(0, 0, -5), vector(0, 0, 1)), 3)
+
+
+@mark.parametrize(
+    "ray",
+    [
+        Ray(point(0, 0, -5), vector(0, 0, 1)),
+        Ray(point(0, 0, 0), vector(0, 0, 1)),
+        Ray(point(0, 0, 0.75), vector(0, 0, -1)),
+        Ray(point(0, 0, 5), vector(0, 0, 1)),
+        Ray(point(0, 0, -5), vector(0, 1, 0)),
+    ]
+)
+def test_world_closest_hit_matches_intersect_hit(ray):
+    world = World.default()
+    expected = world.intersect(ray).hit()
+    hit = world.closest_hit(ray)
+    if expected is None:
+        assert hit is None
+    else:
+        assert hit == expected
+
+
+def test_world_closest_hit_respects_t_max():
+    world = World.default()
+    ray = Ray(point(0, 0, -5), vector(0, 0, 1))
+    assert world.closest_hit(ray, t_max=4.2).distance == 4
+    assert world.closest_hit(ray, t_max=3.9) is None
+
+
+def test_hull_closest_distance():
+    sphere = Sphere()
+    ray = Ray(point(0, 0, 0), vector(0, 0, 1))
+    assert sphere.closest_distance(ray, 10) == 1
+    assert sphere.closest_distance(ray, 0.5) is None